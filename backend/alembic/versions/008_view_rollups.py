@@ -0,0 +1,43 @@
+"""Add parent_view_daily rollups and backfill them from parent_views
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "parent_view_daily",
+        sa.Column("parent_id", sa.Integer(), sa.ForeignKey("parents.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("view_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("user_view_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("guest_view_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        INSERT INTO parent_view_daily (parent_id, day, view_count, user_view_count, guest_view_count)
+        SELECT parent_id,
+               (viewed_at AT TIME ZONE 'UTC')::date,
+               count(*),
+               count(user_id),
+               count(*) - count(user_id)
+        FROM parent_views
+        GROUP BY 1, 2
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("parent_view_daily")
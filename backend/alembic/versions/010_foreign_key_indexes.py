@@ -0,0 +1,42 @@
+"""Index the foreign keys filtered on by hot routes
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+INDEXES = [
+    ("ix_parents_user_id_created_at", "parents", ["user_id", "created_at"]),
+    ("ix_children_parent_id_sort_order", "children", ["parent_id", "sort_order"]),
+    ("ix_parent_views_parent_user_viewed", "parent_views", ["parent_id", "user_id", "viewed_at"]),
+    ("ix_parent_views_user_viewed", "parent_views", ["user_id", "viewed_at"]),
+    ("ix_collaborators_parent_id", "collaborators", ["parent_id"]),
+    ("ix_comments_parent_id_created_at", "comments", ["parent_id", "created_at"]),
+    ("ix_reactions_parent_user_emoji", "reactions", ["parent_id", "user_id", "emoji"]),
+    ("ix_comment_reactions_comment_id", "comment_reactions", ["comment_id"]),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,41 @@
+"""Add reaction_counts and backfill them from reactions
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reaction_counts",
+        sa.Column("parent_id", sa.Integer(), sa.ForeignKey("parents.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("emoji", sa.String(10), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_reaction_counts_user_id", "reaction_counts", ["user_id"])
+    op.execute(
+        """
+        INSERT INTO reaction_counts (parent_id, user_id, emoji, count, updated_at)
+        SELECT parent_id, user_id, emoji, least(count(*), 10), max(created_at)
+        FROM reactions
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reaction_counts_user_id", table_name="reaction_counts")
+    op.drop_table("reaction_counts")
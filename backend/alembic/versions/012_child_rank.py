@@ -0,0 +1,42 @@
+"""Order children by fractional rank keys
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("children", sa.Column("rank", sa.String(64, collation="C"), nullable=True))
+    # Fixed-width keys in the current order; the trailing "V" keeps them valid
+    # rank keys, which must not end in "0" (see app/ranking.py)
+    op.execute(
+        """
+        UPDATE children c
+        SET rank = lpad(o.rn::text, 8, '0') || 'V'
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY parent_id ORDER BY sort_order, id) AS rn
+            FROM children
+        ) o
+        WHERE o.id = c.id
+        """
+    )
+    op.alter_column("children", "rank", nullable=False)
+    op.drop_index("ix_children_parent_id_sort_order", table_name="children")
+    op.create_index("ix_children_parent_id_rank", "children", ["parent_id", "rank"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_children_parent_id_rank", table_name="children")
+    op.create_index("ix_children_parent_id_sort_order", "children", ["parent_id", "sort_order"])
+    op.drop_column("children", "rank")
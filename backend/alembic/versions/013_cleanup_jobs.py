@@ -0,0 +1,41 @@
+"""Add cleanup_jobs for background S3 prefix deletion
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cleanup_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("prefix", sa.String(500), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("deleted_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_cleanup_jobs_status_next_attempt_at", "cleanup_jobs", ["status", "next_attempt_at"])
+    op.create_index("ix_cleanup_jobs_user_id", "cleanup_jobs", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cleanup_jobs_user_id", table_name="cleanup_jobs")
+    op.drop_index("ix_cleanup_jobs_status_next_attempt_at", table_name="cleanup_jobs")
+    op.drop_table("cleanup_jobs")
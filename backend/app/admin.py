@@ -1,9 +1,28 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
+
 from sqladmin import Admin, ModelView
 from sqladmin.authentication import AuthenticationBackend
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import object_session
 from starlette.requests import Request
 
+from app.cleanup import cleanup_worker, deck_prefixes
 from app.config import settings
-from app.models import Child, Collaborator, Comment, Parent, ParentView, Reaction, User
+from app.dependencies import invalidate_user
+from app.models import (
+    Child,
+    CleanupJob,
+    Collaborator,
+    Comment,
+    Parent,
+    ParentView,
+    Reaction,
+    ReactionCount,
+    User,
+)
+from app.ranking import MAX_LENGTH as MAX_RANK_LENGTH, key_between, keys_between
 
 
 class AdminAuth(AuthenticationBackend):
@@ -27,20 +46,78 @@ class AdminAuth(AuthenticationBackend):
         return request.session.get("token") == "authenticated"
 
 
-class UserAdmin(ModelView, model=User):
+async def _user_prefixes(session: AsyncSession, user: User) -> list[str]:
+    parent_ids = (await session.scalars(select(Parent.id).where(Parent.user_id == user.id))).all()
+    return await deck_prefixes(session, list(parent_ids)) + [f"users/{user.id}/profile/"]
+
+
+async def _parent_prefixes(session: AsyncSession, parent: Parent) -> list[str]:
+    return await deck_prefixes(session, [parent.id])
+
+
+class _StorageCleanupMixin:
+    # Queues S3 cleanup in the same transaction as the admin delete;
+    # views set storage_prefixes to the resolver for their model
+    storage_prefixes: Callable[[AsyncSession, Any], Awaitable[list[str]]]
+
+    async def on_model_delete(self, model, request: Request) -> None:
+        # A deleted user's jobs are kept without an owner
+        user_id = getattr(model, "user_id", None)
+        async with self.session_maker() as session:
+            prefixes = await self.storage_prefixes(session, model)
+        object_session(model).add_all(CleanupJob(user_id=user_id, prefix=prefix) for prefix in prefixes)
+
+    async def after_model_delete(self, model, request: Request) -> None:
+        cleanup_worker.wake()
+
+
+class UserAdmin(_StorageCleanupMixin, ModelView, model=User):
     column_list = [User.id, User.full_name, User.email, User.username, User.country, User.profile_picture, User.created_at]
     column_searchable_list = [User.username, User.email, User.full_name]
     form_excluded_columns = [User.password_hash]
+    storage_prefixes = staticmethod(_user_prefixes)
+
+    # Drop the auth snapshot so the change applies from the user's next request
+    async def after_model_change(self, data: dict, model: User, is_created: bool, request: Request) -> None:
+        invalidate_user(model.id)
 
+    async def after_model_delete(self, model: User, request: Request) -> None:
+        invalidate_user(model.id)
+        await super().after_model_delete(model, request)
 
-class ParentAdmin(ModelView, model=Parent):
+
+class ParentAdmin(_StorageCleanupMixin, ModelView, model=Parent):
     column_list = [Parent.id, Parent.label, Parent.user_id, Parent.is_shared, Parent.created_at]
     column_searchable_list = [Parent.label]
+    storage_prefixes = staticmethod(_parent_prefixes)
 
 
 class ChildAdmin(ModelView, model=Child):
-    column_list = [Child.id, Child.name, Child.meaning, Child.parent_id, Child.sort_order]
+    column_list = [Child.id, Child.name, Child.meaning, Child.parent_id, Child.sort_order, Child.rank]
     column_searchable_list = [Child.name]
+    form_excluded_columns = [Child.rank]
+
+    async def on_model_change(self, data: dict, model: Child, is_created: bool, request: Request) -> None:
+        # Names added here go to the end of their deck
+        if is_created and data.get("parent"):
+            parent_id = int(data["parent"])
+            async with self.session_maker() as session:
+                last = await session.scalar(select(func.max(Child.rank)).where(Child.parent_id == parent_id))
+                rank = key_between(last, None)
+                if len(rank) > MAX_RANK_LENGTH:
+                    # Keys have grown too long: spread the deck over fresh keys, the new card last
+                    order = (
+                        await session.scalars(
+                            select(Child.id).where(Child.parent_id == parent_id).order_by(Child.rank, Child.id)
+                        )
+                    ).all()
+                    *keys, rank = keys_between(None, None, len(order) + 1)
+                    await session.execute(
+                        update(Child),
+                        [{"id": child_id, "rank": key} for child_id, key in zip(order, keys)],
+                    )
+                    await session.commit()
+            data["rank"] = rank
 
 
 class CommentAdmin(ModelView, model=Comment):
@@ -52,10 +129,39 @@ class ReactionAdmin(ModelView, model=Reaction):
     column_list = [Reaction.id, Reaction.emoji, Reaction.user_id, Reaction.parent_id, Reaction.created_at]
 
 
+class ReactionCountAdmin(ModelView, model=ReactionCount):
+    column_list = [
+        ReactionCount.parent_id,
+        ReactionCount.user_id,
+        ReactionCount.emoji,
+        ReactionCount.count,
+        ReactionCount.updated_at,
+    ]
+    can_create = False
+    can_edit = False
+
+
 class CollaboratorAdmin(ModelView, model=Collaborator):
     column_list = [Collaborator.id, Collaborator.user_id, Collaborator.parent_id, Collaborator.created_at]
 
 
+class CleanupJobAdmin(ModelView, model=CleanupJob):
+    column_list = [
+        CleanupJob.id,
+        CleanupJob.prefix,
+        CleanupJob.status,
+        CleanupJob.deleted_count,
+        CleanupJob.attempts,
+        CleanupJob.last_error,
+        CleanupJob.next_attempt_at,
+        CleanupJob.updated_at,
+    ]
+    column_searchable_list = [CleanupJob.prefix]
+    can_create = False
+    can_edit = False
+    can_delete = False
+
+
 class ParentViewAdmin(ModelView, model=ParentView):
     column_list = [ParentView.id, ParentView.user_id, ParentView.parent_id, ParentView.viewed_at]
     can_create = False
@@ -71,5 +177,7 @@ def setup_admin(app, engine):
     admin.add_view(ChildAdmin)
     admin.add_view(CommentAdmin)
     admin.add_view(ReactionAdmin)
+    admin.add_view(ReactionCountAdmin)
     admin.add_view(CollaboratorAdmin)
     admin.add_view(ParentViewAdmin)
+    admin.add_view(CleanupJobAdmin)
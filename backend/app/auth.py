@@ -1,19 +1,89 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from app.config import settings
 
-from passlib.context import CryptContext
+from app.config import settings
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
-def hash_password(password: str) -> str:
+# argon2 is deliberately slow; it runs on its own pool so the event loop keeps serving
+_pool: Executor | None = None
+_slots: asyncio.Semaphore | None = None
+_stats = {"in_flight": 0, "waiting": 0, "peak_waiting": 0, "completed": 0, "rejected": 0}
+
+
+def _hash_password_sync(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_password(password: str, hashed: str) -> bool:
+
+def _verify_password_sync(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
 
+def _get_pool() -> Executor:
+    global _pool
+    if _pool is None:
+        if settings.password_hash_executor == "process":
+            _pool = ProcessPoolExecutor(max_workers=settings.password_hash_workers)
+        else:
+            # argon2-cffi releases the GIL, so threads hash in parallel too
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.password_hash_workers, thread_name_prefix="argon2"
+            )
+    return _pool
+
+
+async def _offload(func, *args):
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.password_hash_workers)
+    if _stats["waiting"] >= settings.password_hash_max_queue:
+        _stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again",
+        )
+
+    _stats["waiting"] += 1
+    _stats["peak_waiting"] = max(_stats["peak_waiting"], _stats["waiting"])
+    try:
+        await _slots.acquire()
+    finally:
+        _stats["waiting"] -= 1
+
+    _stats["in_flight"] += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_pool(), func, *args)
+    finally:
+        _stats["in_flight"] -= 1
+        _stats["completed"] += 1
+        _slots.release()
+
+
+async def hash_password(password: str) -> str:
+    return await _offload(_hash_password_sync, password)
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await _offload(_verify_password_sync, password, hashed)
+
+
+def password_hash_stats() -> dict:
+    return {**_stats, "workers": settings.password_hash_workers}
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+
 def create_access_token(user_id: int) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.jwt_expire_minutes)
     payload = {"sub": str(user_id), "exp": expire}
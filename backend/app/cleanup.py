@@ -0,0 +1,196 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from sqlalchemy import and_, func, or_, select, union, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import s3
+from app.config import settings
+from app.database import async_session
+from app.models import CleanupJob, Child, Parent
+
+logger = logging.getLogger(__name__)
+
+# Uploads are keyed users/{uploader}/parents/{deck}/..., so a deck edited by
+# collaborators spreads over one prefix per uploader
+_DECK_PREFIX = "^users/[0-9]+/parents/[0-9]+/"
+
+
+def _deck_prefixes_stmt(parent_ids: list[int]):
+    owners = select(func.concat("users/", Parent.user_id, "/parents/", Parent.id, "/")).where(
+        Parent.id.in_(parent_ids)
+    )
+    uploaders = select(func.substring(Child.audio_key, _DECK_PREFIX)).where(
+        Child.parent_id.in_(parent_ids), Child.audio_key.is_not(None)
+    )
+    return union(owners, uploaders)
+
+
+async def deck_prefixes(db: AsyncSession, parent_ids: list[int]) -> list[str]:
+    """Every S3 prefix holding objects of the given decks."""
+    if not parent_ids:
+        return []
+    found = (await db.scalars(_deck_prefixes_stmt(parent_ids))).all()
+    # Only ever hand back prefixes that belong to the decks being removed
+    suffixes = tuple(f"/parents/{pid}/" for pid in parent_ids)
+    return sorted(p for p in found if p and p.endswith(suffixes))
+
+
+class CleanupError(Exception):
+    pass
+
+
+class CleanupWorker:
+    """Runs queued S3 prefix deletions outside the request path.
+
+    Jobs are rows in cleanup_jobs, added in the same transaction as the delete
+    that leaves the objects behind, so none are lost. Every API worker runs
+    one of these: jobs are claimed with SKIP LOCKED, and a running job whose
+    progress has not moved for ``stale_after`` seconds (its worker died) is
+    claimed again. Listing pages through the whole prefix and each page is
+    deleted with one DeleteObjects call; a failing job is retried with
+    exponential backoff until ``max_attempts``.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float,
+        max_attempts: int,
+        retry_base: float,
+        batch_retries: int,
+        stale_after: int,
+    ):
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.batch_retries = batch_retries
+        self.stale_after = stale_after
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._current: int | None = None
+        self._stats = {"completed": 0, "failed": 0, "retried": 0, "deleted": 0}
+
+    def wake(self) -> None:
+        """Look for work now instead of at the next poll."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _claim(self) -> CleanupJob | None:
+        stale = func.now() - timedelta(seconds=self.stale_after)
+        claimable = (
+            select(CleanupJob.id)
+            .where(
+                or_(
+                    and_(CleanupJob.status == "pending", CleanupJob.next_attempt_at <= func.now()),
+                    and_(CleanupJob.status == "running", CleanupJob.updated_at < stale),
+                )
+            )
+            .order_by(CleanupJob.next_attempt_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with async_session() as db:
+            job = await db.scalar(
+                update(CleanupJob)
+                .where(CleanupJob.id == claimable)
+                .values(status="running", attempts=CleanupJob.attempts + 1, last_error=None)
+                .returning(CleanupJob)
+            )
+            await db.commit()
+        return job
+
+    async def _set(self, job_id: int, **values) -> None:
+        async with async_session() as db:
+            await db.execute(update(CleanupJob).where(CleanupJob.id == job_id).values(**values))
+            await db.commit()
+
+    async def _delete_batch(self, keys: list[str]) -> None:
+        failed = await s3.delete_keys(keys)
+        for attempt in range(self.batch_retries):
+            if not failed:
+                return
+            await asyncio.sleep(2**attempt)
+            failed = await s3.delete_keys(failed)
+        if failed:
+            raise CleanupError(f"S3 refused to delete {len(failed)} keys, e.g. {failed[0]}")
+
+    async def _process(self, job: CleanupJob) -> None:
+        deleted = job.deleted_count
+        try:
+            # Deleting while listing is safe: the continuation token is a position, not an index
+            async for keys in s3.list_keys(job.prefix):
+                await self._delete_batch(keys)
+                deleted += len(keys)
+                self._stats["deleted"] += len(keys)
+                # Doubles as the heartbeat that keeps the job from being reclaimed
+                await self._set(job.id, deleted_count=deleted)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Cleanup of %s failed (attempt %d)", job.prefix, job.attempts, exc_info=True)
+            error = f"{type(e).__name__}: {e}"[:1000]
+            if job.attempts >= self.max_attempts:
+                self._stats["failed"] += 1
+                await self._set(job.id, status="failed", last_error=error, finished_at=func.now())
+            else:
+                self._stats["retried"] += 1
+                delay = timedelta(seconds=self.retry_base * 2 ** (job.attempts - 1))
+                await self._set(job.id, status="pending", last_error=error, next_attempt_at=func.now() + delay)
+            return
+        self._stats["completed"] += 1
+        await self._set(job.id, status="done", deleted_count=deleted, finished_at=func.now())
+
+    async def run_once(self) -> bool:
+        """Claim and run one job; False when there was nothing to do."""
+        job = await self._claim()
+        if job is None:
+            return False
+        self._current = job.id
+        try:
+            await self._process(job)
+        finally:
+            self._current = None
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                while await self.run_once():
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Cleanup worker could not reach the database")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # A job cut off here is still "running" and gets reclaimed once stale
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {**self._stats, "current_job": self._current}
+
+
+cleanup_worker = CleanupWorker(
+    poll_interval=settings.cleanup_poll_interval,
+    max_attempts=settings.cleanup_max_attempts,
+    retry_base=settings.cleanup_retry_base,
+    batch_retries=settings.cleanup_batch_retries,
+    stale_after=settings.cleanup_stale_after,
+)
@@ -0,0 +1,78 @@
+from fastapi import Response
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models import Comment
+from app.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from app.s3 import presigned_url
+from app.schemas import CommentOut
+
+
+def comment_out(c: Comment) -> CommentOut:
+    return CommentOut(
+        id=c.id,
+        user_id=c.user_id,
+        username=c.user.username,
+        full_name=c.user.full_name,
+        profile_picture_url=presigned_url(c.user.profile_picture) if c.user.profile_picture else None,
+        parent_id=c.parent_id,
+        parent_label=c.parent.label,
+        text=c.text,
+        created_at=c.created_at,
+    )
+
+
+def comment_feed_stmt(
+    stmt: Select, limit: int | None, after: tuple | None = None, since: tuple | None = None
+) -> Select:
+    """The query behind ``comment_feed`` for decoded ``cursor``/``since`` keys."""
+    key = tuple_(Comment.created_at, Comment.id)
+    stmt = stmt.options(selectinload(Comment.user), selectinload(Comment.parent))
+
+    if since is not None:
+        stmt = stmt.where(key > tuple_(*since))
+        return stmt.order_by(Comment.created_at, Comment.id).limit(limit or MAX_PAGE_SIZE)
+
+    if after is not None:
+        stmt = stmt.where(key < tuple_(*after))
+    stmt = stmt.order_by(Comment.created_at.desc(), Comment.id.desc())
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+    return stmt
+
+
+async def comment_feed(
+    db: AsyncSession,
+    response: Response,
+    stmt: Select,
+    limit: int | None,
+    cursor: str | None,
+    since: str | None,
+) -> list[CommentOut] | None:
+    """Run a comment listing newest first, keyset-paginated on (created_at, id).
+
+    ``cursor`` pages towards older comments (next page in ``X-Next-Cursor``).
+    ``since`` returns only comments newer than that cursor, oldest ``limit``
+    first so a poller can catch up in steps; None means nothing is new.
+    ``X-Latest-Cursor`` carries the cursor to poll with next.
+    """
+    if since:
+        stmt = comment_feed_stmt(stmt, limit, since=decode_cursor(since))
+        comments = list((await db.execute(stmt)).scalars().all())
+        if not comments:
+            return None
+        comments.reverse()
+        response.headers["X-Latest-Cursor"] = encode_cursor(comments[0].created_at, comments[0].id)
+        return [comment_out(c) for c in comments]
+
+    stmt = comment_feed_stmt(stmt, limit, after=decode_cursor(cursor) if cursor else None)
+    comments = list((await db.execute(stmt)).scalars().all())
+
+    if limit is not None and len(comments) > limit:
+        comments = comments[:limit]
+        last = comments[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    if comments and not cursor:
+        response.headers["X-Latest-Cursor"] = encode_cursor(comments[0].created_at, comments[0].id)
+    return [comment_out(c) for c in comments]
@@ -10,6 +10,16 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     jwt_expire_minutes: int = 1440  # 24 hours
 
+    # Authenticated-user cache
+    user_cache_enabled: bool = True
+    user_cache_ttl: int = 30  # seconds
+    user_cache_size: int = 10000
+
+    # Password hashing
+    password_hash_executor: str = "thread"  # "thread" or "process"
+    password_hash_workers: int = 4  # max concurrent argon2 hashes per API worker
+    password_hash_max_queue: int = 256  # waiting hashes before answering 503
+
     # S3
     s3_bucket: str = "names-audio"
     s3_region: str = "us-east-1"
@@ -17,6 +27,41 @@ class Settings(BaseSettings):
     aws_access_key_id: str = ""
     aws_secret_access_key: str = ""
     s3_presigned_expiry: int = 3600  # 1 hour
+    s3_max_workers: int = 16  # threads dedicated to blocking S3 calls
+    s3_max_pool_connections: int = 16  # keep >= s3_max_workers
+    s3_multipart_chunk_size: int = 5 * 1024 * 1024  # S3 minimum part size
+    s3_presign_cache_size: int = 10000  # cached presigned URLs
+    s3_presign_refresh_margin: int = 300  # re-sign this many seconds before expiry
+    bulk_upload_concurrency: int = 4  # parallel audio uploads per bulk child request
+
+    # View tracking (write-behind buffer)
+    view_batch_size: int = 500  # flush as soon as this many views are pending
+    view_flush_interval: float = 5.0  # seconds between timed flushes
+    view_max_pending: int = 50000  # views beyond this are dropped until a flush
+    view_dedup_max_tracked: int = 100000  # (deck, viewer) pairs kept for dedup
+    guest_view_bloom_bits: int = 8 * 1024 * 1024  # per generation; 2 generations = 2 MiB
+    guest_view_bloom_hashes: int = 7
+
+    # Deck events (server-sent events)
+    events_queue_size: int = 100  # buffered events per connection before it must resync
+    events_heartbeat: float = 15.0  # seconds between keep-alive comments
+    events_max_subscribers: int = 10000  # open event streams per API worker
+
+    # Public deck response cache
+    public_deck_cache_backend: str = "memory"  # "memory", "redis" or "off"
+    public_deck_cache_url: str = ""  # e.g. redis://localhost:6379/0 for the redis backend
+    public_deck_cache_ttl: int = 120  # seconds; entries also roll over with presigned URLs
+    public_deck_cache_size: int = 1000  # decks kept by the memory backend
+
+    # S3 cleanup jobs
+    cleanup_poll_interval: float = 30.0  # seconds between checks for queued jobs
+    cleanup_max_attempts: int = 8  # a job is marked failed after this many tries
+    cleanup_retry_base: float = 10.0  # seconds; doubles with every failed attempt
+    cleanup_batch_retries: int = 3  # retries of the keys S3 refused in one batch
+    cleanup_stale_after: int = 300  # seconds without progress before a running job is reclaimed
+
+    # Reactions
+    reaction_history_enabled: bool = True  # also keep one reactions row per tap
 
     # Admin
     admin_username: str = "admin"
@@ -0,0 +1,190 @@
+"""Deck export and import files.
+
+A deck archive is a ZIP holding ``manifest.json`` (label plus cards in deck
+order), the same cards as ``cards.csv`` for spreadsheets, and each card's audio
+under ``audio/``. The manifest or the CSV on its own is also accepted on import.
+"""
+import asyncio
+import codecs
+import csv
+import io
+import json
+import re
+import zipfile
+import zlib
+from collections.abc import AsyncIterator, Iterable, Iterator
+from datetime import datetime, timezone
+from itertools import islice
+
+from botocore.exceptions import ClientError
+
+from app.models import Child
+from app.s3 import stream_object
+
+MANIFEST = "manifest.json"
+CARDS_CSV = "cards.csv"
+CARD_FIELDS = ["name", "phonetic", "meaning", "passage", "sort_order", "audio"]
+AUDIO_TYPES = {"mp3": "audio/mpeg", "m4a": "audio/mp4", "wav": "audio/wav", "ogg": "audio/ogg"}
+MAX_MANIFEST_SIZE = 5 * 1024 * 1024
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+def card(child: Child) -> dict:
+    return {
+        "name": child.name,
+        "phonetic": child.phonetic,
+        "meaning": child.meaning,
+        "passage": child.passage,
+        "sort_order": child.sort_order,
+        "audio": None,
+    }
+
+
+def filename(label: str, ext: str) -> str:
+    stem = re.sub(r"[^A-Za-z0-9._-]+", "-", label).strip("-.") or "deck"
+    return f"{stem}.{ext}"
+
+
+def manifest(label: str, cards: list[dict]) -> str:
+    exported_at = datetime.now(timezone.utc).isoformat()
+    return json.dumps({"label": label, "exported_at": exported_at, "children": cards}, ensure_ascii=False, indent=2)
+
+
+def csv_lines(cards: Iterable[dict]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, CARD_FIELDS)
+    writer.writeheader()
+    for row in cards:
+        writer.writerow(row)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    yield buf.getvalue()
+
+
+class _Sink(io.RawIOBase):
+    # Unseekable, so ZipFile writes data descriptors instead of seeking back
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def zip_stream(label: str, cards: list[dict], audio_keys: list[str | None]) -> AsyncIterator[bytes]:
+    """Stream a deck archive. Audio is relayed from S3 one chunk at a time;
+    a card whose object has gone missing is exported without audio."""
+    sink = _Sink()
+    stamp = datetime.now().timetuple()[:6]
+    with zipfile.ZipFile(sink, "w") as archive:
+        for position, (row, key) in enumerate(zip(cards, audio_keys), 1):
+            if not key:
+                continue
+            chunks = stream_object(key)
+            try:
+                chunk = await anext(chunks)
+            except (ClientError, StopAsyncIteration):
+                continue
+            try:
+                ext = key.rsplit(".", 1)[-1] if "." in key else "mp3"
+                row["audio"] = f"audio/{position:04d}.{ext}"
+                # Audio is already compressed; store it as is
+                with archive.open(zipfile.ZipInfo(row["audio"], date_time=stamp), "w") as member:
+                    while chunk:
+                        member.write(chunk)
+                        yield sink.drain()
+                        chunk = await anext(chunks, b"")
+            finally:
+                await chunks.aclose()
+        archive.writestr(MANIFEST, manifest(label, cards), compress_type=zipfile.ZIP_DEFLATED)
+        archive.writestr(CARDS_CSV, "".join(csv_lines(cards)), compress_type=zipfile.ZIP_DEFLATED)
+    yield sink.drain()
+
+
+def _cards_from_json(raw: bytes) -> list[dict]:
+    if len(raw) > MAX_MANIFEST_SIZE:
+        raise ArchiveError("Manifest too large")
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        raise ArchiveError("Manifest is not valid JSON")
+    cards = data.get("children") if isinstance(data, dict) else data
+    if not isinstance(cards, list) or not all(isinstance(c, dict) for c in cards):
+        raise ArchiveError("Manifest must list the names as objects")
+    return cards
+
+
+def _cards_from_csv(lines: Iterable[str], limit: int) -> list[dict]:
+    try:
+        rows = list(islice(csv.DictReader(lines), limit))
+    except (UnicodeDecodeError, csv.Error):
+        raise ArchiveError("CSV could not be read")
+    # Blank cells mean "not set"
+    return [{k: v for k, v in row.items() if k and v not in ("", None)} for row in rows]
+
+
+def _cards_from_zip(archive: zipfile.ZipFile, limit: int) -> list[dict]:
+    members = set(archive.namelist())
+    try:
+        if MANIFEST in members:
+            with archive.open(MANIFEST) as f:
+                return _cards_from_json(f.read(MAX_MANIFEST_SIZE + 1))
+        if CARDS_CSV in members:
+            with archive.open(CARDS_CSV) as f:
+                return _cards_from_csv(codecs.iterdecode(f, "utf-8-sig"), limit + 1)
+    except (zipfile.BadZipFile, zlib.error):
+        raise ArchiveError("Archive is corrupt")
+    raise ArchiveError(f"Archive has neither {MANIFEST} nor {CARDS_CSV}")
+
+
+def read_cards(file, name: str | None, limit: int) -> tuple[list[dict], zipfile.ZipFile | None]:
+    """Parse an uploaded archive, manifest or CSV; at most ``limit + 1`` cards
+    are read from a CSV. For a ZIP the open ZipFile is returned as well, to
+    read audio members from. Blocking: run it in a thread."""
+    name = (name or "").lower()
+    if name.endswith(".zip") or zipfile.is_zipfile(file):
+        file.seek(0)
+        try:
+            archive = zipfile.ZipFile(file)
+        except zipfile.BadZipFile:
+            raise ArchiveError("Not a valid ZIP archive")
+        try:
+            return _cards_from_zip(archive, limit), archive
+        except BaseException:
+            archive.close()
+            raise
+
+    file.seek(0)
+    if name.endswith(".csv"):
+        return _cards_from_csv(codecs.iterdecode(file, "utf-8-sig"), limit + 1), None
+    return _cards_from_json(file.read(MAX_MANIFEST_SIZE + 1)), None
+
+
+class MemberReader:
+    """Async ``read(n)`` over a ZIP member, in the shape upload_stream expects.
+    The member is opened on first read so idle uploads hold nothing open."""
+
+    def __init__(self, archive: zipfile.ZipFile, name: str):
+        self._archive = archive
+        self._name = name
+        self._member = None
+
+    async def read(self, size: int) -> bytes:
+        if self._member is None:
+            self._member = self._archive.open(self._name)
+        data = await asyncio.to_thread(self._member.read, size)
+        if not data:
+            self._member.close()
+        return data
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable
+
+from app.cache import TTLCache
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """Per-process LRU; the default."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> str | None:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.invalidate(key)
+
+
+class RedisBackend:
+    """Shared across workers. ``client`` is any object with redis.asyncio's
+    ``get``/``set``/``delete`` signatures, so a stand-in can be passed in tests."""
+
+    def __init__(self, client):
+        self._client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        import redis.asyncio as redis  # imported here so other backends don't load it
+
+        return cls(redis.from_url(url, decode_responses=True))
+
+    async def get(self, key: str) -> str | None:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        await self._client.set(key, value, ex=ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+
+class PublicDeckCache:
+    """Caches the viewer-independent part of public deck responses.
+
+    One entry per deck, tagged with the content version it was built from; an
+    entry whose version no longer matches is a miss, so stale data is never
+    served even if an invalidation is lost. Concurrent misses for the same
+    version in one process share a single load.
+    """
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self._inflight: dict[tuple[int, str], asyncio.Task] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    @staticmethod
+    def _key(parent_id: int) -> str:
+        return f"public-deck:{parent_id}"
+
+    async def get_or_load(
+        self, parent_id: int, version: str, load: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        if self.backend is None:
+            return await load()
+
+        try:
+            raw = await self.backend.get(self._key(parent_id))
+        except Exception:
+            logger.warning("Public deck cache read failed", exc_info=True)
+            self._stats["errors"] += 1
+            raw = None
+        if raw is not None:
+            entry = json.loads(raw)
+            if entry["version"] == version:
+                self._stats["hits"] += 1
+                return entry["body"]
+
+        flight = (parent_id, version)
+        task = self._inflight.get(flight)
+        if task is None:
+            self._stats["misses"] += 1
+            task = asyncio.ensure_future(self._load(parent_id, version, load))
+            self._inflight[flight] = task
+            task.add_done_callback(lambda _: self._inflight.pop(flight, None))
+        else:
+            self._stats["coalesced"] += 1
+        # Shielded so one cancelled request does not abort the load the others wait on
+        return await asyncio.shield(task)
+
+    async def _load(self, parent_id: int, version: str, load: Callable[[], Awaitable[dict]]) -> dict:
+        body = await load()
+        try:
+            await self.backend.set(
+                self._key(parent_id), json.dumps({"version": version, "body": body}), self.ttl
+            )
+        except Exception:
+            logger.warning("Public deck cache write failed", exc_info=True)
+            self._stats["errors"] += 1
+        return body
+
+    async def invalidate(self, parent_id: int) -> None:
+        if self.backend is None:
+            return
+        try:
+            await self.backend.delete(self._key(parent_id))
+        except Exception:
+            logger.warning("Public deck cache invalidation failed", exc_info=True)
+            self._stats["errors"] += 1
+
+    def stats(self) -> dict:
+        backend = type(self.backend).__name__ if self.backend is not None else None
+        return {**self._stats, "backend": backend, "inflight": len(self._inflight)}
+
+
+def _make_backend():
+    kind = settings.public_deck_cache_backend
+    if kind == "memory":
+        return MemoryBackend(maxsize=settings.public_deck_cache_size, ttl=settings.public_deck_cache_ttl)
+    if kind == "redis":
+        return RedisBackend.from_url(settings.public_deck_cache_url)
+    if kind == "off":
+        return None
+    raise ValueError(f"Unknown PUBLIC_DECK_CACHE_BACKEND: {kind!r}")
+
+
+public_deck_cache = PublicDeckCache(_make_backend(), ttl=settings.public_deck_cache_ttl)
@@ -1,11 +1,43 @@
 from fastapi import Cookie, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from app.auth import decode_access_token
+from app.cache import TTLCache
+from app.config import settings
 from app.database import get_db
 from app.models import User
 
+# Column snapshots of recently authenticated users, keyed by the JWT subject
+_user_cache = TTLCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl)
+_user_columns = [attr.key for attr in inspect(User).column_attrs]
+
+
+async def _load_user(user_id: int, db: AsyncSession) -> User | None:
+    if settings.user_cache_enabled:
+        snapshot = _user_cache.get(user_id)
+        if snapshot is not None:
+            # Attach a detached copy to this request's session without a SELECT,
+            # so routes can still modify and commit the user as usual
+            user = User(**snapshot)
+            make_transient_to_detached(user)
+            return await db.merge(user, load=False)
+
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is not None and settings.user_cache_enabled:
+        _user_cache.set(user_id, {key: getattr(user, key) for key in _user_columns})
+    return user
+
+
+def invalidate_user(user_id: int) -> None:
+    _user_cache.invalidate(user_id)
+
+
+def user_cache_stats() -> dict:
+    return {"enabled": settings.user_cache_enabled, **_user_cache.stats()}
+
 
 async def get_current_user(
     access_token: str | None = Cookie(default=None),
@@ -18,8 +50,7 @@ async def get_current_user(
     if user_id is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await _load_user(user_id, db)
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
@@ -35,5 +66,4 @@ async def get_optional_user(
     user_id = decode_access_token(access_token)
     if user_id is None:
         return None
-    result = await db.execute(select(User).where(User.id == user_id))
-    return result.scalar_one_or_none()
+    return await _load_user(user_id, db)
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+import asyncpg
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "deck_events"
+RECONNECT_DELAY = 5.0
+_PENDING = "deck_events_pending"  # Session.info key for events awaiting commit
+
+
+class EventBroker:
+    """Fans deck events out to SSE subscribers.
+
+    Writers publish with pg_notify inside their transaction, so events are only
+    delivered once the write commits, and every API worker LISTENing on the
+    channel delivers them to its own subscribers. Each subscriber has a bounded
+    queue; a subscriber that falls behind is told to resync instead of growing
+    its queue.
+    """
+
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: dict[int, set[asyncio.Queue]] = defaultdict(set)
+        self._count = 0
+        self._listening = False
+        self._task: asyncio.Task | None = None
+        self._stats = {"published": 0, "delivered": 0, "resyncs": 0, "rejected": 0}
+
+    def subscribe(self, parent_id: int) -> asyncio.Queue | None:
+        if self._count >= self.max_subscribers:
+            self._stats["rejected"] += 1
+            return None
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[parent_id].add(queue)
+        self._count += 1
+        return queue
+
+    def unsubscribe(self, parent_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(parent_id)
+        if queues is None or queue not in queues:
+            return
+        queues.discard(queue)
+        self._count -= 1
+        if not queues:
+            del self._subscribers[parent_id]
+
+    async def publish(self, db: AsyncSession, parent_id: int, event: str, data: dict | None = None) -> None:
+        payload = json.dumps({"parent_id": parent_id, "event": event, "data": data or {}})
+        self._stats["published"] += 1
+        if self._listening:
+            await db.execute(select(func.pg_notify(CHANNEL, payload)))
+        else:
+            # No LISTEN connection: deliver to this worker's subscribers only,
+            # and like NOTIFY not before the transaction commits
+            self._defer(db.sync_session, payload)
+
+    def _defer(self, session, payload: str) -> None:
+        pending = session.info.get(_PENDING)
+        if pending is None:
+            pending = session.info[_PENDING] = []
+            event.listen(session, "after_commit", self._flush)
+            # Runs after after_commit, so whatever is left was rolled back or closed
+            event.listen(session, "after_transaction_end", self._discard)
+        if not session.in_transaction():
+            session.begin()
+        pending.append(payload)
+
+    def _flush(self, session) -> None:
+        pending, session.info[_PENDING] = session.info[_PENDING], []
+        for payload in pending:
+            self._deliver(payload)
+
+    @staticmethod
+    def _discard(session, transaction) -> None:
+        if transaction.parent is None:
+            session.info[_PENDING] = []
+
+    def _deliver(self, payload: str) -> None:
+        message = json.loads(payload)
+        for queue in self._subscribers.get(message["parent_id"], ()):
+            if queue.full():
+                # Slow consumer: drop its backlog and ask it to refetch everything
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"event": "resync", "data": {}})
+                self._stats["resyncs"] += 1
+                continue
+            queue.put_nowait({"event": message["event"], "data": message["data"]})
+            self._stats["delivered"] += 1
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            self._deliver(payload)
+        except Exception:
+            logger.exception("Bad deck event payload: %r", payload)
+
+    async def _listen(self) -> None:
+        dsn = settings.database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+        while True:
+            closed = asyncio.Event()
+            try:
+                connection = await asyncpg.connect(dsn)
+            except Exception:
+                logger.warning("Deck event listener could not connect; retrying", exc_info=True)
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+            try:
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(CHANNEL, self._on_notify)
+                self._listening = True
+                await closed.wait()
+                logger.warning("Deck event listener disconnected; reconnecting")
+            except Exception:
+                # e.g. the connection dropped while the listeners were being added
+                logger.warning("Deck event listener failed; reconnecting", exc_info=True)
+            finally:
+                self._listening = False
+                if not connection.is_closed():
+                    connection.terminate()
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "listening": self._listening,
+            "subscribers": self._count,
+            "decks": len(self._subscribers),
+        }
+
+
+event_broker = EventBroker(
+    queue_size=settings.events_queue_size,
+    max_subscribers=settings.events_max_subscribers,
+)
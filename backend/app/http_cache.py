@@ -0,0 +1,39 @@
+import hashlib
+import time
+
+from fastapi import Request, Response, status
+
+from app.config import settings
+
+# Browsers keep the body but revalidate it with If-None-Match on every use
+REVALIDATE = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def presign_epoch() -> int:
+    # Responses carrying presigned URLs change tag every half refresh margin, so
+    # a 304 never hands back URLs with less than that much validity left
+    return int(time.time() // max(settings.s3_presign_refresh_margin // 2, 1))
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses weak comparison
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str | None = None) -> Response:
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE} if etag else None
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE
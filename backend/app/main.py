@@ -1,11 +1,42 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app import auth, s3
 from app.admin import setup_admin
+from app.cleanup import cleanup_worker
 from app.database import engine
-from app.routers import analytics_routes, auth_routes, child_routes, parent_routes, profile_routes, recent_routes, user_routes
+from app.deck_cache import public_deck_cache
+from app.dependencies import user_cache_stats
+from app.events import event_broker
+from app.routers import (
+    analytics_routes,
+    auth_routes,
+    child_routes,
+    cleanup_routes,
+    parent_routes,
+    profile_routes,
+    recent_routes,
+    user_routes,
+)
+from app.view_tracking import view_recorder
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    view_recorder.start()
+    event_broker.start()
+    cleanup_worker.start()
+    yield
+    await cleanup_worker.stop()
+    await event_broker.stop()
+    await view_recorder.stop()
+    s3.shutdown()
+    auth.shutdown()
 
-app = FastAPI(title="Ìkókó Flashcard API")
+
+app = FastAPI(title="Ìkókó Flashcard API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,6 +44,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Latest-Cursor", "ETag"],
 )
 
 app.include_router(auth_routes.router)
@@ -22,6 +54,7 @@ app.include_router(analytics_routes.router)
 app.include_router(profile_routes.router)
 app.include_router(recent_routes.router)
 app.include_router(user_routes.router)
+app.include_router(cleanup_routes.router)
 
 setup_admin(app, engine)
 
@@ -29,3 +62,16 @@ setup_admin(app, engine)
 @app.get("/api/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/api/health/metrics")
+async def metrics():
+    return {
+        "presign_cache": s3.presign_cache_stats(),
+        "password_hash": auth.password_hash_stats(),
+        "user_cache": user_cache_stats(),
+        "view_tracking": view_recorder.stats(),
+        "events": event_broker.stats(),
+        "public_deck_cache": public_deck_cache.stats(),
+        "cleanup": cleanup_worker.stats(),
+    }
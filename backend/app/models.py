@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -32,6 +32,7 @@ class User(Base):
 
 class Parent(Base):
     __tablename__ = "parents"
+    __table_args__ = (Index("ix_parents_user_id_created_at", "user_id", "created_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(
@@ -48,7 +49,7 @@ class Parent(Base):
 
     user: Mapped["User"] = relationship(back_populates="parents")
     children: Mapped[list["Child"]] = relationship(
-        back_populates="parent", cascade="all, delete-orphan", order_by="Child.sort_order"
+        back_populates="parent", cascade="all, delete-orphan", order_by="Child.rank"
     )
     collaborators: Mapped[list["Collaborator"]] = relationship(
         back_populates="parent", cascade="all, delete-orphan"
@@ -57,6 +58,7 @@ class Parent(Base):
 
 class Child(Base):
     __tablename__ = "children"
+    __table_args__ = (Index("ix_children_parent_id_rank", "parent_id", "rank"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     parent_id: Mapped[int] = mapped_column(
@@ -68,6 +70,8 @@ class Child(Base):
     passage: Mapped[str | None] = mapped_column(String(300), nullable=True)
     audio_key: Mapped[str | None] = mapped_column(String(500), nullable=True)
     sort_order: Mapped[int] = mapped_column(Integer, default=0)
+    # Fractional key (app/ranking.py) that cards are ordered by; "C" so it compares bytewise
+    rank: Mapped[str] = mapped_column(String(64, collation="C"), nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -80,6 +84,10 @@ class Child(Base):
 
 class ParentView(Base):
     __tablename__ = "parent_views"
+    __table_args__ = (
+        Index("ix_parent_views_parent_user_viewed", "parent_id", "user_id", "viewed_at"),
+        Index("ix_parent_views_user_viewed", "user_id", "viewed_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int | None] = mapped_column(
@@ -93,10 +101,35 @@ class ParentView(Base):
     )
 
 
+class ParentViewDaily(Base):
+    __tablename__ = "parent_view_daily"
+
+    parent_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("parents.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)  # UTC
+    view_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    user_view_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    guest_view_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class ParentViewHourly(Base):
+    __tablename__ = "parent_view_hourly"
+
+    parent_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("parents.id", ondelete="CASCADE"), primary_key=True
+    )
+    hour: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    view_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    user_view_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    guest_view_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
 class Collaborator(Base):
     __tablename__ = "collaborators"
     __table_args__ = (
         UniqueConstraint("user_id", "parent_id", name="uq_collaborator_user_parent"),
+        Index("ix_collaborators_parent_id", "parent_id"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -116,6 +149,7 @@ class Collaborator(Base):
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (Index("ix_comments_parent_id_created_at", "parent_id", "created_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(
@@ -135,6 +169,7 @@ class Comment(Base):
 
 class Reaction(Base):
     __tablename__ = "reactions"
+    __table_args__ = (Index("ix_reactions_parent_user_emoji", "parent_id", "user_id", "emoji"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(
@@ -152,10 +187,28 @@ class Reaction(Base):
     parent: Mapped["Parent"] = relationship()
 
 
+class ReactionCount(Base):
+    __tablename__ = "reaction_counts"
+    __table_args__ = (Index("ix_reaction_counts_user_id", "user_id"),)
+
+    parent_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("parents.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    emoji: Mapped[str] = mapped_column(String(10), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+
 class CommentReaction(Base):
     __tablename__ = "comment_reactions"
     __table_args__ = (
         UniqueConstraint("user_id", "comment_id", "emoji", name="uq_comment_reaction"),
+        Index("ix_comment_reactions_comment_id", "comment_id"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -172,3 +225,34 @@ class CommentReaction(Base):
 
     user: Mapped["User"] = relationship()
     comment: Mapped["Comment"] = relationship()
+
+
+class CleanupJob(Base):
+    """An S3 prefix left to delete after its deck or account is gone."""
+
+    __tablename__ = "cleanup_jobs"
+    __table_args__ = (
+        Index("ix_cleanup_jobs_status_next_attempt_at", "status", "next_attempt_at"),
+        Index("ix_cleanup_jobs_user_id", "user_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Who asked for it; kept NULL once that account is gone
+    user_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    prefix: Mapped[str] = mapped_column(String(500), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")  # pending, running, done, failed
+    deleted_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
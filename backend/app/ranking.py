@@ -0,0 +1,46 @@
+"""Fractional rank keys for ordering cards within a deck.
+
+Keys are strings over an ASCII-ordered base-62 alphabet, compared bytewise
+(the column uses the "C" collation). There is always another key between any
+two, so a card can be moved by rewriting only its own key. Keys never end in
+the lowest digit, which is what guarantees that gap exists.
+"""
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+MAX_LENGTH = 64  # column width; past this a deck is renumbered
+
+
+def _midpoint(lo: str, hi: str | None) -> str:
+    if hi is not None:
+        # Keep the shared prefix (lo padded with the zero digit) and split the rest
+        n = 0
+        while n < len(hi) and (lo[n] if n < len(lo) else DIGITS[0]) == hi[n]:
+            n += 1
+        if n:
+            return hi[:n] + _midpoint(lo[n:], hi[n:])
+
+    lo_digit = DIGITS.index(lo[0]) if lo else 0
+    hi_digit = DIGITS.index(hi[0]) if hi is not None else BASE
+    if hi_digit - lo_digit > 1:
+        return DIGITS[(lo_digit + hi_digit) // 2]
+    # Adjacent first digits
+    if hi is not None and len(hi) > 1:
+        return hi[0]
+    return DIGITS[lo_digit] + _midpoint(lo[1:], None)
+
+
+def key_between(lo: str | None, hi: str | None) -> str:
+    """A key ordering after ``lo`` and before ``hi``; None means unbounded."""
+    if lo is not None and hi is not None and lo >= hi:
+        raise ValueError(f"{lo!r} must sort before {hi!r}")
+    return _midpoint(lo or "", hi)
+
+
+def keys_between(lo: str | None, hi: str | None, n: int) -> list[str]:
+    """``n`` ascending keys between ``lo`` and ``hi``, spread so they stay short."""
+    if n <= 0:
+        return []
+    half = n // 2
+    mid = key_between(lo, hi)
+    return keys_between(lo, mid, half) + [mid] + keys_between(mid, hi, n - half - 1)
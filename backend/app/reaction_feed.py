@@ -0,0 +1,35 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Parent, ReactionCount, User
+from app.schemas import ReactionOut
+
+
+def reaction_rows_stmt(*where):
+    return (
+        select(ReactionCount, User.username)
+        .join(User, User.id == ReactionCount.user_id)
+        .join(Parent, Parent.id == ReactionCount.parent_id)
+        .where(ReactionCount.count > 0, *where)
+        .order_by(ReactionCount.updated_at.desc())
+    )
+
+
+async def reaction_rows(db: AsyncSession, *where) -> list[ReactionOut]:
+    """Per-user reaction counts, most recently changed first.
+
+    Read from reaction_counts, which is kept current whether or not the
+    per-tap reactions history is being written.
+    """
+    result = await db.execute(reaction_rows_stmt(*where))
+    return [
+        ReactionOut(
+            user_id=r.user_id,
+            username=username,
+            parent_id=r.parent_id,
+            emoji=r.emoji,
+            count=r.count,
+            updated_at=r.updated_at,
+        )
+        for r, username in result.all()
+    ]
@@ -1,43 +1,63 @@
-from fastapi import APIRouter, Depends
+from array import array
+from datetime import datetime, time, timedelta, timezone
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from app.comment_feed import comment_feed
 from app.database import get_db
 from app.dependencies import get_current_user
-from app.models import Child, Comment, Parent, ParentView, Reaction, User
-from app.s3 import presigned_url
-from app.schemas import AnalyticsSummary, CommentOut, ReactionOut, SharedParentSummary
+from app.http_cache import etag_matches, make_etag, not_modified, set_etag
+from app.models import Child, Comment, Parent, ParentViewDaily, ParentViewHourly, ReactionCount, User
+from app.pagination import MAX_PAGE_SIZE
+from app.reaction_feed import reaction_rows
+from app.schemas import AnalyticsSummary, ReactionTotal, SharedParentSummary, ViewSeries
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
+MAX_SERIES_BUCKETS = 1000
+SERIES_STEPS = {"day": timedelta(days=1), "hour": timedelta(hours=1)}
+DEFAULT_SERIES_BUCKETS = {"day": 30, "hour": 48}
 
-@router.get("/summary", response_model=AnalyticsSummary)
-async def get_summary(
-    user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-):
-    # Total names created across all owned parents
-    names_result = await db.execute(
+
+def _names_created_stmt(user_id: int):
+    return (
         select(func.count(Child.id))
         .join(Parent, Child.parent_id == Parent.id)
-        .where(Parent.user_id == user.id)
+        .where(Parent.user_id == user_id)
     )
-    total_names = names_result.scalar() or 0
 
-    # Shared parents with view counts (total, user, guest)
-    shared_result = await db.execute(
+
+def _shared_parents_stmt(user_id: int):
+    # View counts (total, user, guest) per owned deck, read from the daily rollups
+    return (
         select(
             Parent.id,
             Parent.label,
-            func.count(ParentView.id).label("view_count"),
-            func.count(ParentView.user_id).label("user_view_count"),
+            func.sum(ParentViewDaily.view_count).label("view_count"),
+            func.sum(ParentViewDaily.user_view_count).label("user_view_count"),
+            func.sum(ParentViewDaily.guest_view_count).label("guest_view_count"),
         )
-        .outerjoin(ParentView, ParentView.parent_id == Parent.id)
-        .where(Parent.user_id == user.id)
+        .join(ParentViewDaily, ParentViewDaily.parent_id == Parent.id)
+        .where(Parent.user_id == user_id)
         .group_by(Parent.id, Parent.label)
-        .having(func.count(ParentView.id) > 0)
+        .having(func.sum(ParentViewDaily.view_count) > 0)
     )
+
+
+@router.get("/summary", response_model=AnalyticsSummary)
+async def get_summary(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    # Total names created across all owned parents
+    names_result = await db.execute(_names_created_stmt(user.id))
+    total_names = names_result.scalar() or 0
+
+    # Shared parents with view counts
+    shared_result = await db.execute(_shared_parents_stmt(user.id))
     shared_rows = shared_result.all()
 
     shared_parents = [
@@ -46,7 +66,7 @@ async def get_summary(
             label=row[1],
             view_count=row[2],
             user_view_count=row[3],
-            guest_view_count=row[2] - row[3],
+            guest_view_count=row[4],
         )
         for row in shared_rows
     ]
@@ -58,55 +78,129 @@ async def get_summary(
     )
 
 
+def _floor_bucket(ts: datetime, granularity: str) -> datetime:
+    ts = ts.astimezone(timezone.utc) if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+    ts = ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if granularity == "day" else ts
+
+
+def _view_series_stmt(parent_id: int, granularity: str, start: datetime, end: datetime):
+    # Read the pre-aggregated buckets only; cost depends on the range, never on raw view rows
+    if granularity == "day":
+        bucket = ParentViewDaily.day
+        rollup = ParentViewDaily
+        bounds = (start.date(), end.date())
+    else:
+        bucket = ParentViewHourly.hour
+        rollup = ParentViewHourly
+        bounds = (start, end)
+    return select(bucket, rollup.view_count, rollup.user_view_count, rollup.guest_view_count).where(
+        rollup.parent_id == parent_id, bucket.between(*bounds)
+    )
+
+
+@router.get("/parents/{parent_id}/views", response_model=ViewSeries)
+async def get_view_series(
+    parent_id: int,
+    granularity: Literal["day", "hour"] = "day",
+    start: datetime | None = None,
+    end: datetime | None = None,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    owned = await db.execute(
+        select(Parent.id).where(Parent.id == parent_id, Parent.user_id == user.id)
+    )
+    if owned.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Parent not found")
+
+    step = SERIES_STEPS[granularity]
+    end = _floor_bucket(end or datetime.now(timezone.utc), granularity)
+    if start is None:
+        start = end - step * (DEFAULT_SERIES_BUCKETS[granularity] - 1)
+    start = _floor_bucket(start, granularity)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    size = (end - start) // step + 1
+    if size > MAX_SERIES_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Range too large (max {MAX_SERIES_BUCKETS} buckets)")
+
+    result = await db.execute(_view_series_stmt(parent_id, granularity, start, end))
+
+    views = array("q", bytes(8 * size))
+    user_views = array("q", bytes(8 * size))
+    guest_views = array("q", bytes(8 * size))
+    for row_bucket, total, users, guests in result.all():
+        if granularity == "day":
+            row_bucket = datetime.combine(row_bucket, time(), tzinfo=timezone.utc)
+        i = (row_bucket - start) // step
+        views[i], user_views[i], guest_views[i] = total, users, guests
+
+    return ViewSeries(
+        parent_id=parent_id,
+        granularity=granularity,
+        start=start,
+        view_count=views.tolist(),
+        user_view_count=user_views.tolist(),
+        guest_view_count=guest_views.tolist(),
+    )
+
+
+def _owned_comments_stmt(user_id: int):
+    return select(Comment).join(Parent, Comment.parent_id == Parent.id).where(Parent.user_id == user_id)
+
+
 @router.get("/comments")
 async def get_all_comments(
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    since: str | None = None,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    # All comments on user's owned parents
-    comment_result = await db.execute(
-        select(Comment)
-        .join(Parent, Comment.parent_id == Parent.id)
-        .where(Parent.user_id == user.id)
-        .options(selectinload(Comment.user), selectinload(Comment.parent))
-        .order_by(Comment.created_at.desc())
+    # Comments on user's owned parents, paged like the per-deck feeds
+    comments_out = await comment_feed(
+        db,
+        response,
+        _owned_comments_stmt(user.id),
+        limit,
+        cursor,
+        since,
     )
-    comments = comment_result.scalars().all()
-
-    comments_out = [
-        CommentOut(
-            id=c.id,
-            user_id=c.user_id,
-            username=c.user.username,
-            full_name=c.user.full_name,
-            profile_picture_url=presigned_url(c.user.profile_picture) if c.user.profile_picture else None,
-            parent_id=c.parent_id,
-            parent_label=c.parent.label,
-            text=c.text,
-            created_at=c.created_at,
-        )
-        for c in comments
-    ]
+    if comments_out is None:
+        return not_modified()
+    if cursor or since:
+        # Reactions only accompany the first page
+        return {"comments": comments_out, "reactions": []}
+
+    # Reaction counts on user's owned parents
+    reactions_out = await reaction_rows(db, Parent.user_id == user.id)
+    return {"comments": comments_out, "reactions": reactions_out}
+
 
-    # All reactions on user's owned parents
-    reaction_result = await db.execute(
-        select(Reaction)
-        .join(Parent, Reaction.parent_id == Parent.id)
-        .where(Parent.user_id == user.id)
-        .options(selectinload(Reaction.user))
-        .order_by(Reaction.created_at.desc())
+def _reaction_totals_stmt(user_id: int):
+    return (
+        select(ReactionCount.parent_id, ReactionCount.emoji, func.sum(ReactionCount.count))
+        .join(Parent, Parent.id == ReactionCount.parent_id)
+        .where(Parent.user_id == user_id, ReactionCount.count > 0)
+        .group_by(ReactionCount.parent_id, ReactionCount.emoji)
+        .order_by(ReactionCount.parent_id, func.sum(ReactionCount.count).desc(), ReactionCount.emoji)
     )
-    reactions = reaction_result.scalars().all()
-
-    reactions_out = [
-        ReactionOut(
-            id=r.id,
-            user_id=r.user_id,
-            username=r.user.username,
-            parent_id=r.parent_id,
-            emoji=r.emoji,
-        )
-        for r in reactions
-    ]
 
-    return {"comments": comments_out, "reactions": reactions_out}
+
+@router.get("/reactions", response_model=list[ReactionTotal])
+async def get_reaction_totals(
+    request: Request,
+    response: Response,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    # Per deck and emoji totals on user's owned parents, for the feed's periodic refresh
+    result = await db.execute(_reaction_totals_stmt(user.id))
+    rows = result.all()
+    etag = make_etag("reaction-totals", user.id, *rows)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return [ReactionTotal(parent_id=pid, emoji=emoji, count=count) for pid, emoji, count in rows]
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -6,6 +6,7 @@ from app.auth import create_access_token, hash_password, verify_password
 from app.config import settings
 from app.database import get_db
 from app.dependencies import get_current_user
+from app.http_cache import etag_matches, make_etag, not_modified, presign_epoch, set_etag
 from app.models import User
 from app.s3 import presigned_url
 from app.schemas import LoginRequest, RegisterRequest, UserResponse
@@ -29,7 +30,7 @@ async def register(body: RegisterRequest, db: AsyncSession = Depends(get_db)):
         email=body.email,
         country=body.country,
         username=body.username,
-        password_hash=hash_password(body.password),
+        password_hash=await hash_password(body.password),
     )
     db.add(user)
     await db.commit()
@@ -56,7 +57,7 @@ async def login(body: LoginRequest, response: Response, db: AsyncSession = Depen
     result = await db.execute(select(User).where(User.username == body.username))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(body.password, user.password_hash):
+    if not user or not await verify_password(body.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = create_access_token(user.id)
@@ -78,7 +79,12 @@ async def logout(response: Response):
 
 
 @router.get("/me", response_model=UserResponse)
-async def me(user: User = Depends(get_current_user)):
+async def me(request: Request, response: Response, user: User = Depends(get_current_user)):
+    etag = make_etag("me", user.id, user.updated_at, user.profile_picture and presign_epoch())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
     data = UserResponse.model_validate(user)
     if user.profile_picture:
         data.profile_picture_url = presigned_url(user.profile_picture)
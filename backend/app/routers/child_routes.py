@@ -1,17 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
-from sqlalchemy import select
+import asyncio
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from typing import Literal
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import Integer, String, column, func, insert, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import deck_archive
+from app.config import settings
 from app.database import get_db
+from app.deck_cache import public_deck_cache
 from app.dependencies import get_current_user
+from app.events import event_broker
 from app.models import Child, Collaborator, Parent, User
-from app.s3 import build_key, delete_object, presigned_url, upload_audio
-from app.schemas import ChildCreate, ChildOut, ChildUpdate
+from app.ranking import MAX_LENGTH as MAX_RANK_LENGTH, key_between, keys_between
+from app.s3 import UploadTooLarge, build_key, delete_object, presigned_url, upload_stream
+from app.schemas import (
+    ChildBulkItem,
+    ChildBulkResult,
+    ChildCreate,
+    ChildMove,
+    ChildOrder,
+    ChildOut,
+    ChildUpdate,
+)
 
 router = APIRouter(prefix="/api/parents/{parent_id}/children", tags=["children"])
 
 ALLOWED_AUDIO = {"audio/mpeg", "audio/mp4", "audio/x-m4a", "audio/wav", "audio/ogg"}
 MAX_AUDIO_SIZE = 10 * 1024 * 1024  # 10 MB
+MAX_BULK_CHILDREN = 100  # with MAX_AUDIO_SIZE, sets client_max_body_size for /bulk in nginx
+MAX_REORDER_IDS = 5000
+MAX_IMPORT_CHILDREN = 1000
+MAX_IMPORT_SIZE = 500 * 1024 * 1024  # keep in step with client_max_body_size for /import in nginx
 
 
 async def _get_parent_owned(parent_id: int, user: User, db) -> Parent:
@@ -38,6 +64,161 @@ async def _get_parent_owned(parent_id: int, user: User, db) -> Parent:
     raise HTTPException(status_code=404, detail="Parent not found")
 
 
+async def _lock_deck_order(db, parent_id: int) -> None:
+    # Serializes rank changes within a deck; NO KEY UPDATE leaves FK inserts unblocked
+    await db.execute(select(Parent.id).where(Parent.id == parent_id).with_for_update(key_share=True))
+
+
+async def _ranks_for(db, parent_id: int, sort_orders: list[int], exclude_id: int | None = None) -> list[str]:
+    """Ranks for cards placed by ``sort_order``: each lands after the last card
+    with an equal or lower sort_order, ties keeping the order given."""
+    stmt = select(Child.rank, Child.sort_order).where(Child.parent_id == parent_id).order_by(Child.rank)
+    if exclude_id is not None:
+        stmt = stmt.where(Child.id != exclude_id)
+    existing = (await db.execute(stmt)).all()
+
+    # Gap g lies between existing[g - 1] and existing[g]
+    gaps: dict[int, list[int]] = defaultdict(list)
+    for i, sort_order in sorted(enumerate(sort_orders), key=lambda item: item[1]):
+        gap = max((j + 1 for j, row in enumerate(existing) if row.sort_order <= sort_order), default=0)
+        gaps[gap].append(i)
+
+    ranks = [""] * len(sort_orders)
+    for gap, members in gaps.items():
+        lo = existing[gap - 1].rank if gap else None
+        hi = existing[gap].rank if gap < len(existing) else None
+        for i, rank in zip(members, keys_between(lo, hi, len(members))):
+            ranks[i] = rank
+    return ranks
+
+
+async def _write_ranks(db, ranks: dict[int, str]) -> None:
+    if not ranks:
+        return
+    rows = values(column("id", Integer), column("rank", String), name="v").data(list(ranks.items()))
+    await db.execute(
+        update(Child)
+        .where(Child.id == rows.c.id)
+        .values(rank=rows.c.rank)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _deck_order_stmt(parent_id: int, exclude_id: int | None = None):
+    stmt = select(Child.id).where(Child.parent_id == parent_id).order_by(Child.rank, Child.id)
+    if exclude_id is not None:
+        stmt = stmt.where(Child.id != exclude_id)
+    return stmt
+
+
+async def _deck_order(db, parent_id: int, exclude_id: int | None = None) -> list[int]:
+    return list((await db.scalars(_deck_order_stmt(parent_id, exclude_id))).all())
+
+
+def _following_rank_stmt(parent_id: int, child_id: int, after_rank: str | None):
+    # Lowest rank after the target slot, ignoring the card being moved
+    stmt = select(func.min(Child.rank)).where(Child.parent_id == parent_id, Child.id != child_id)
+    if after_rank is not None:
+        stmt = stmt.where(Child.rank > after_rank)
+    return stmt
+
+
+async def _fitting_ranks(db, parent_id: int, place: Callable[[], Awaitable[list[str]]]) -> list[str]:
+    """Ranks from ``place``; if any would outgrow the column, the deck is
+    renumbered with evenly spread keys once and the cards placed again."""
+    ranks = await place()
+    if all(len(rank) <= MAX_RANK_LENGTH for rank in ranks):
+        return ranks
+    order = await _deck_order(db, parent_id)
+    await _write_ranks(db, dict(zip(order, keys_between(None, None, len(order)))))
+    return await place()
+
+
+async def _allocate_child_ids(db, n: int) -> list[int]:
+    # Ids come from the sequence up front so audio keys are known before any row exists
+    return (
+        await db.scalars(
+            select(func.nextval(func.pg_get_serial_sequence(Child.__tablename__, "id")))
+            .select_from(func.generate_series(1, n))
+        )
+    ).all()
+
+
+async def _upload_audio(
+    semaphore: asyncio.Semaphore, key: str, file, content_type: str | None, size: int | None
+) -> tuple[str | None, str | None]:
+    """Upload one file for a batch; returns (key, None) or (None, reason)."""
+    if content_type not in ALLOWED_AUDIO:
+        return None, "Unsupported audio format"
+    if size is not None and size > MAX_AUDIO_SIZE:
+        return None, "File too large (max 10MB)"
+    async with semaphore:
+        try:
+            await upload_stream(key, file, content_type, MAX_AUDIO_SIZE)
+        except UploadTooLarge:
+            return None, "File too large (max 10MB)"
+        except (BotoCoreError, ClientError):
+            return None, "Audio upload failed"
+    return key, None
+
+
+async def _insert_children(
+    db,
+    parent_id: int,
+    entries: list[ChildCreate],
+    ids: list[int],
+    outcomes: dict[int, tuple[str | None, str | None]],
+    append: bool = False,
+) -> list[ChildBulkResult]:
+    """Write a batch of names with one INSERT. ``append`` puts them after the
+    last card in the order given; otherwise they are placed by sort_order.
+    If the write fails, the audio already uploaded for the batch is deleted."""
+    try:
+        await _lock_deck_order(db, parent_id)
+
+        async def place() -> list[str]:
+            if append:
+                last = await db.scalar(select(func.max(Child.rank)).where(Child.parent_id == parent_id))
+                return keys_between(last, None, len(entries))
+            return await _ranks_for(db, parent_id, [entry.sort_order for entry in entries])
+
+        ranks = await _fitting_ranks(db, parent_id, place)
+        rows = [
+            {
+                **entry.model_dump(exclude={"audio_index"}),
+                "id": ids[i],
+                "parent_id": parent_id,
+                "audio_key": outcomes.get(i, (None, None))[0],
+                "rank": ranks[i],
+            }
+            for i, entry in enumerate(entries)
+        ]
+        children = (
+            await db.scalars(insert(Child).returning(Child, sort_by_parameter_order=True), rows)
+        ).all()
+        await event_broker.publish(db, parent_id, "children")
+        await db.commit()
+    except Exception:
+        await asyncio.gather(*(delete_object(key) for key, _ in outcomes.values() if key))
+        raise
+    await public_deck_cache.invalidate(parent_id)
+
+    return [
+        ChildBulkResult(index=i, child=_child_response(child), audio_error=outcomes.get(i, (None, None))[1])
+        for i, child in enumerate(children)
+    ]
+
+
+def _validation_error(e: ValidationError) -> HTTPException:
+    return HTTPException(
+        status_code=422, detail=e.errors(include_url=False, include_context=False, include_input=False)
+    )
+
+
+def _audio_ext(file: UploadFile) -> str:
+    return file.filename.rsplit(".", 1)[-1] if "." in file.filename else "mp3"
+
+
 def _child_response(child: Child) -> ChildOut:
     return ChildOut(
         id=child.id,
@@ -59,6 +240,8 @@ async def create_child(
     db=Depends(get_db),
 ):
     parent = await _get_parent_owned(parent_id, user, db)
+    await _lock_deck_order(db, parent_id)
+    [rank] = await _fitting_ranks(db, parent_id, lambda: _ranks_for(db, parent_id, [body.sort_order]))
     child = Child(
         parent_id=parent.id,
         name=body.name,
@@ -66,9 +249,225 @@ async def create_child(
         meaning=body.meaning,
         passage=body.passage,
         sort_order=body.sort_order,
+        rank=rank,
     )
     db.add(child)
+    await event_broker.publish(db, parent_id, "children")
     await db.commit()
+    await public_deck_cache.invalidate(parent_id)
+    await db.refresh(child)
+    return _child_response(child)
+
+
+@router.post("/bulk", response_model=list[ChildBulkResult], status_code=201)
+async def create_children_bulk(
+    parent_id: int,
+    items: str = Form(...),
+    audio: list[UploadFile] = File(default=[]),
+    user: User = Depends(get_current_user),
+    db=Depends(get_db),
+):
+    """Create many names at once. ``items`` is a JSON array of ChildBulkItem;
+    an item's ``audio_index`` picks its file from the ``audio`` parts.
+
+    Rows are written together or not at all. An audio file that is rejected or
+    fails to upload leaves its name without audio and is reported in that
+    item's ``audio_error``.
+    """
+    try:
+        entries = TypeAdapter(list[ChildBulkItem]).validate_json(items)
+    except ValidationError as e:
+        raise _validation_error(e)
+    if not entries:
+        raise HTTPException(status_code=400, detail="No names given")
+    if len(entries) > MAX_BULK_CHILDREN:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_CHILDREN} names per request")
+    claimed = [e.audio_index for e in entries if e.audio_index is not None]
+    if len(set(claimed)) != len(claimed) or any(not 0 <= i < len(audio) for i in claimed):
+        raise HTTPException(status_code=400, detail="Each audio_index must point at a different audio part")
+
+    await _get_parent_owned(parent_id, user, db)
+    user_id = user.id
+    ids = await _allocate_child_ids(db, len(entries))
+    # Don't sit on a pooled connection while the uploads run
+    await db.close()
+
+    semaphore = asyncio.Semaphore(settings.bulk_upload_concurrency)
+    pending = {}
+    for i, entry in enumerate(entries):
+        if entry.audio_index is None:
+            continue
+        file = audio[entry.audio_index]
+        key = build_key(user_id, parent_id, ids[i], _audio_ext(file))
+        pending[i] = _upload_audio(semaphore, key, file, file.content_type, file.size)
+    outcomes = dict(zip(pending, await asyncio.gather(*pending.values())))
+
+    return await _insert_children(db, parent_id, entries, ids, outcomes)
+
+
+@router.get("/export")
+async def export_children(
+    parent_id: int,
+    fmt: Literal["zip", "json", "csv"] = Query("zip", alias="format"),
+    user: User = Depends(get_current_user),
+    db=Depends(get_db),
+):
+    """Download the deck's names: a ZIP with audio (streamed straight from
+    S3), or just the JSON manifest or CSV."""
+    parent = await _get_parent_owned(parent_id, user, db)
+    children = (
+        await db.scalars(select(Child).where(Child.parent_id == parent_id).order_by(Child.rank))
+    ).all()
+    cards = [deck_archive.card(c) for c in children]
+    headers = {"Content-Disposition": f'attachment; filename="{deck_archive.filename(parent.label, fmt)}"'}
+
+    if fmt == "json":
+        return Response(deck_archive.manifest(parent.label, cards), media_type="application/json", headers=headers)
+    if fmt == "csv":
+        return StreamingResponse(deck_archive.csv_lines(cards), media_type="text/csv; charset=utf-8", headers=headers)
+    return StreamingResponse(
+        deck_archive.zip_stream(parent.label, cards, [c.audio_key for c in children]),
+        media_type="application/zip",
+        headers=headers,
+    )
+
+
+@router.post("/import", response_model=list[ChildBulkResult], status_code=201)
+async def import_children(
+    parent_id: int,
+    file: UploadFile,
+    user: User = Depends(get_current_user),
+    db=Depends(get_db),
+):
+    """Append names from an export: the ZIP (with audio), or its manifest.json
+    or cards.csv alone. Names keep the file's order after the existing cards."""
+    if file.size is not None and file.size > MAX_IMPORT_SIZE:
+        raise HTTPException(status_code=413, detail="Import file too large (max 500MB)")
+    await _get_parent_owned(parent_id, user, db)
+    user_id = user.id
+
+    try:
+        cards, archive = await asyncio.to_thread(
+            deck_archive.read_cards, file.file, file.filename, MAX_IMPORT_CHILDREN
+        )
+    except deck_archive.ArchiveError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        if not cards:
+            raise HTTPException(status_code=400, detail="No names given")
+        if len(cards) > MAX_IMPORT_CHILDREN:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_IMPORT_CHILDREN} names per import")
+        try:
+            entries = TypeAdapter(list[ChildCreate]).validate_python(cards)
+        except ValidationError as e:
+            raise _validation_error(e)
+
+        ids = await _allocate_child_ids(db, len(entries))
+        await db.close()
+
+        semaphore = asyncio.Semaphore(settings.bulk_upload_concurrency)
+        outcomes: dict[int, tuple[str | None, str | None]] = {}
+        pending = {}
+        for i, row in enumerate(cards):
+            name = row.get("audio")
+            if archive is None or not name:
+                continue
+            try:
+                info = archive.getinfo(name)
+            except KeyError:
+                outcomes[i] = (None, "Audio file not found in archive")
+                continue
+            ext = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+            key = build_key(user_id, parent_id, ids[i], ext)
+            reader = deck_archive.MemberReader(archive, name)
+            pending[i] = _upload_audio(semaphore, key, reader, deck_archive.AUDIO_TYPES.get(ext), info.file_size)
+        outcomes.update(zip(pending, await asyncio.gather(*pending.values())))
+    finally:
+        if archive is not None:
+            archive.close()
+
+    return await _insert_children(db, parent_id, entries, ids, outcomes, append=True)
+
+
+@router.put("/order", status_code=204)
+async def reorder_children(
+    parent_id: int,
+    body: ChildOrder,
+    user: User = Depends(get_current_user),
+    db=Depends(get_db),
+):
+    """Put the listed cards in the given order. A partial list rearranges those
+    cards among the positions they already hold; everything else stays put."""
+    ids = body.child_ids
+    if len(ids) > MAX_REORDER_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_REORDER_IDS} ids per request")
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Duplicate child ids")
+
+    await _get_parent_owned(parent_id, user, db)
+    await _lock_deck_order(db, parent_id)
+    current = dict((await db.execute(select(Child.id, Child.rank).where(Child.parent_id == parent_id))).all())
+    if any(child_id not in current for child_id in ids):
+        raise HTTPException(status_code=404, detail="Child not found")
+
+    if len(ids) == len(current):
+        # Whole deck: fresh evenly spread keys, which also shortens grown ones
+        slots = keys_between(None, None, len(ids))
+    else:
+        slots = sorted(current[child_id] for child_id in ids)
+    ranks = {child_id: rank for child_id, rank in zip(ids, slots) if current[child_id] != rank}
+    if not ranks:
+        return
+
+    await _write_ranks(db, ranks)
+    await event_broker.publish(db, parent_id, "children")
+    await db.commit()
+    await public_deck_cache.invalidate(parent_id)
+
+
+@router.post("/{child_id}/move", response_model=ChildOut)
+async def move_child(
+    parent_id: int,
+    child_id: int,
+    body: ChildMove,
+    user: User = Depends(get_current_user),
+    db=Depends(get_db),
+):
+    """Move one card to just after ``after_id``. Only that card's rank changes."""
+    if body.after_id == child_id:
+        raise HTTPException(status_code=400, detail="A card cannot follow itself")
+
+    await _get_parent_owned(parent_id, user, db)
+    await _lock_deck_order(db, parent_id)
+
+    result = await db.execute(
+        select(Child).where(Child.id == child_id, Child.parent_id == parent_id)
+    )
+    child = result.scalar_one_or_none()
+    if not child:
+        raise HTTPException(status_code=404, detail="Child not found")
+
+    lo = None
+    if body.after_id is not None:
+        lo = await db.scalar(
+            select(Child.rank).where(Child.id == body.after_id, Child.parent_id == parent_id)
+        )
+        if lo is None:
+            raise HTTPException(status_code=404, detail="Child not found")
+    hi = await db.scalar(_following_rank_stmt(parent_id, child_id, lo))
+
+    rank = key_between(lo, hi)
+    if len(rank) <= MAX_RANK_LENGTH:
+        child.rank = rank
+    else:
+        # Keys in this gap have grown too long: renumber the whole deck once
+        order = await _deck_order(db, parent_id, exclude_id=child_id)
+        order.insert(order.index(body.after_id) + 1 if body.after_id is not None else 0, child_id)
+        await _write_ranks(db, dict(zip(order, keys_between(None, None, len(order)))))
+
+    await event_broker.publish(db, parent_id, "children")
+    await db.commit()
+    await public_deck_cache.invalidate(parent_id)
     await db.refresh(child)
     return _child_response(child)
 
@@ -93,20 +492,24 @@ async def upload_child_audio(
     if file.content_type not in ALLOWED_AUDIO:
         raise HTTPException(status_code=400, detail="Unsupported audio format")
 
-    data = await file.read()
-    if len(data) > MAX_AUDIO_SIZE:
+    if file.size is not None and file.size > MAX_AUDIO_SIZE:
         raise HTTPException(status_code=400, detail="File too large (max 10MB)")
 
-    ext = file.filename.rsplit(".", 1)[-1] if "." in file.filename else "mp3"
-    key = build_key(user.id, parent_id, child_id, ext)
+    key = build_key(user.id, parent_id, child_id, _audio_ext(file))
 
-    # Delete old audio if exists
-    if child.audio_key:
-        delete_object(child.audio_key)
+    try:
+        await upload_stream(key, file, file.content_type, MAX_AUDIO_SIZE)
+    except UploadTooLarge:
+        raise HTTPException(status_code=400, detail="File too large (max 10MB)")
+
+    # Delete old audio if it lived under a different key
+    if child.audio_key and child.audio_key != key:
+        await delete_object(child.audio_key)
 
-    upload_audio(key, data, file.content_type)
     child.audio_key = key
+    await event_broker.publish(db, parent_id, "children")
     await db.commit()
+    await public_deck_cache.invalidate(parent_id)
     await db.refresh(child)
     return _child_response(child)
 
@@ -129,10 +532,17 @@ async def update_child(
         raise HTTPException(status_code=404, detail="Child not found")
 
     update_data = body.model_dump(exclude_unset=True)
+    if update_data.get("sort_order") not in (None, child.sort_order):
+        await _lock_deck_order(db, parent_id)
+        [child.rank] = await _fitting_ranks(
+            db, parent_id, lambda: _ranks_for(db, parent_id, [update_data["sort_order"]], exclude_id=child.id)
+        )
     for field, value in update_data.items():
         setattr(child, field, value)
 
+    await event_broker.publish(db, parent_id, "children")
     await db.commit()
+    await public_deck_cache.invalidate(parent_id)
     await db.refresh(child)
     return _child_response(child)
 
@@ -154,7 +564,9 @@ async def delete_child(
         raise HTTPException(status_code=404, detail="Child not found")
 
     if child.audio_key:
-        delete_object(child.audio_key)
+        await delete_object(child.audio_key)
 
     await db.delete(child)
+    await event_broker.publish(db, parent_id, "children")
     await db.commit()
+    await public_deck_cache.invalidate(parent_id)
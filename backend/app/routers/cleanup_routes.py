@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.dependencies import get_current_user
+from app.models import CleanupJob, User
+from app.schemas import CleanupJobOut
+
+router = APIRouter(prefix="/api/cleanup-jobs", tags=["cleanup"])
+
+RECENT_JOBS = 50
+
+
+@router.get("/", response_model=list[CleanupJobOut])
+async def list_cleanup_jobs(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """The caller's most recent storage cleanup jobs, newest first."""
+    result = await db.execute(
+        select(CleanupJob)
+        .where(CleanupJob.user_id == user.id)
+        .order_by(CleanupJob.id.desc())
+        .limit(RECENT_JOBS)
+    )
+    return result.scalars().all()
+
+
+@router.get("/{job_id}", response_model=CleanupJobOut)
+async def get_cleanup_job(
+    job_id: int,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    job = await db.scalar(
+        select(CleanupJob).where(CleanupJob.id == job_id, CleanupJob.user_id == user.id)
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Cleanup job not found")
+    return job
@@ -1,92 +1,219 @@
-from datetime import datetime, timedelta, timezone
+import asyncio
+import json
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, exists, func, insert, literal, or_, select, tuple_, union, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.database import get_db
+from app.cleanup import cleanup_worker, deck_prefixes
+from app.comment_feed import comment_feed
+from app.config import settings
+from app.database import async_session, get_db
+from app.deck_cache import public_deck_cache
 from app.dependencies import get_current_user, get_optional_user
-from app.models import Child, Collaborator, Comment, CommentReaction, Parent, ParentView, Reaction, User
-from app.s3 import delete_prefix, presigned_url
+from app.events import event_broker
+from app.http_cache import etag_matches, make_etag, not_modified, presign_epoch, set_etag
+from app.models import (
+    Child,
+    CleanupJob,
+    Collaborator,
+    Comment,
+    CommentReaction,
+    Parent,
+    Reaction,
+    ReactionCount,
+    User,
+)
+from app.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from app.reaction_feed import reaction_rows
+from app.s3 import presigned_url
 from app.schemas import (
     ChildOut,
+    CleanupJobOut,
     CollaboratorAdd,
     CollaboratorOut,
     CommentCreate,
+    CommentEmojiCount,
     CommentOut,
     CommentReactionOut,
+    CommentReactionSummary,
     CommentReactionToggle,
+    EmojiCount,
     ParentCreate,
     ParentDetail,
     ParentOut,
     ParentUpdate,
     PublicParentDetail,
     ReactionOut,
+    ReactionSummary,
     ReactionToggle,
 )
+from app.view_tracking import guest_fingerprint, view_recorder
 
 router = APIRouter(prefix="/api/parents", tags=["parents"])
 
 
+def _children_count():
+    return (
+        select(func.count(Child.id))
+        .where(Child.parent_id == Parent.id)
+        .correlate(Parent)
+        .scalar_subquery()
+    )
+
+
+def _deck_watermark_stmt(parent_id: int, viewer_id: int | None):
+    # Everything a deck response is built from, reduced to a few index lookups.
+    # Ids only grow, so (count, max id) changes whenever rows are added or removed.
+    children = (
+        select(func.concat_ws(":", func.count(Child.id), func.max(Child.id), func.max(Child.updated_at)))
+        .where(Child.parent_id == Parent.id)
+        .correlate(Parent)
+        .scalar_subquery()
+    )
+    collaborators = (
+        select(
+            func.concat_ws(
+                ":", func.count(Collaborator.id), func.max(Collaborator.id), func.max(User.updated_at)
+            )
+        )
+        .join(User, User.id == Collaborator.user_id)
+        .where(Collaborator.parent_id == Parent.id)
+        .correlate(Parent)
+        .scalar_subquery()
+    )
+    owner_updated_at = (
+        select(User.updated_at).where(User.id == Parent.user_id).correlate(Parent).scalar_subquery()
+    )
+    is_collaborator = (
+        exists()
+        .where(Collaborator.parent_id == Parent.id, Collaborator.user_id == viewer_id)
+        .correlate(Parent)
+    )
+    return select(
+        Parent.user_id,
+        Parent.is_shared,
+        Parent.updated_at,
+        owner_updated_at.label("owner_updated_at"),
+        children.label("children"),
+        collaborators.label("collaborators"),
+        is_collaborator.label("is_collaborator"),
+    ).where(Parent.id == parent_id)
+
+
+def _decks_stmt(*where):
+    # Decks with everything a detail response needs, loaded by selectin queries
+    return (
+        select(Parent)
+        .where(*where)
+        .options(
+            selectinload(Parent.children),
+            selectinload(Parent.user),
+            selectinload(Parent.collaborators).selectinload(Collaborator.user),
+        )
+    )
+
+
+def _track_view(request: Request, parent_id: int, user: User | None) -> None:
+    if user is None:
+        # Guests are deduped per hour on a hashed IP + user-agent fingerprint
+        view_recorder.record(parent_id, None, guest_fingerprint(request, parent_id))
+    else:
+        view_recorder.record(parent_id, user.id)
+
+
+def _readable_by(user_id: int):
+    return or_(
+        Parent.user_id == user_id,
+        Parent.id.in_(select(Collaborator.parent_id).where(Collaborator.user_id == user_id)),
+        Parent.is_shared,
+    )
+
+
+async def _read_denied(db: AsyncSession, parent_id: int, user_id: int) -> HTTPException | None:
+    result = await db.execute(
+        select(_readable_by(user_id)).select_from(Parent).where(Parent.id == parent_id)
+    )
+    readable = result.scalar_one_or_none()
+    if readable is None:
+        return HTTPException(status_code=404, detail="Parent not found")
+    if not readable:
+        return HTTPException(status_code=403, detail="This card has not been shared")
+    return None
+
+
+async def _require_shared(db: AsyncSession, parent_id: int) -> None:
+    result = await db.execute(select(Parent.is_shared).where(Parent.id == parent_id))
+    is_shared = result.scalar_one_or_none()
+    if is_shared is None:
+        raise HTTPException(status_code=404, detail="Parent not found")
+    if not is_shared:
+        raise HTTPException(status_code=403, detail="This card has not been shared")
+
+
+def _list_parents_stmt(user_id: int, after: tuple | None = None, limit: int | None = None):
+    # Owned and collaborated deck ids in one pass; UNION also drops duplicates
+    accessible = union(
+        select(Parent.id.label("parent_id")).where(Parent.user_id == user_id),
+        select(Collaborator.parent_id).where(Collaborator.user_id == user_id),
+    ).subquery()
+
+    stmt = (
+        select(
+            Parent.id,
+            Parent.label,
+            Parent.is_shared,
+            Parent.created_at,
+            Parent.updated_at,
+            (Parent.user_id == user_id).label("is_owner"),
+            User.full_name.label("owner_name"),
+            _children_count().label("children_count"),
+        )
+        .join(accessible, accessible.c.parent_id == Parent.id)
+        .join(User, Parent.user_id == User.id)
+        .order_by(Parent.created_at.desc(), Parent.id.desc())
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(Parent.created_at, Parent.id) < tuple_(*after))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
 @router.get("/", response_model=list[ParentOut])
 async def list_parents(
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    # Own parents
+    # Keyset pagination on (created_at, id), newest first; without a limit every deck is returned
+    after = decode_cursor(cursor) if cursor else None
     result = await db.execute(
-        select(Parent)
-        .where(Parent.user_id == user.id)
-        .options(selectinload(Parent.children), selectinload(Parent.user))
-        .order_by(Parent.created_at.desc())
+        _list_parents_stmt(user.id, after, limit + 1 if limit is not None else None)
     )
-    owned = result.scalars().all()
+    rows = result.all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
 
-    # Parents where user is a collaborator
-    collab_result = await db.execute(
-        select(Parent)
-        .join(Collaborator, Collaborator.parent_id == Parent.id)
-        .where(Collaborator.user_id == user.id)
-        .options(selectinload(Parent.children), selectinload(Parent.user))
-        .order_by(Parent.created_at.desc())
-    )
-    collab_parents = collab_result.scalars().all()
-
-    # Merge, avoiding duplicates
-    seen_ids = set()
-    all_parents = []
-    for p in owned:
-        seen_ids.add(p.id)
-        all_parents.append(
-            ParentOut(
-                id=p.id,
-                label=p.label,
-                children_count=len(p.children),
-                is_owner=True,
-                owner_name=p.user.full_name,
-                is_shared=p.is_shared,
-                created_at=p.created_at,
-                updated_at=p.updated_at,
-            )
+    return [
+        ParentOut(
+            id=row.id,
+            label=row.label,
+            children_count=row.children_count,
+            is_owner=row.is_owner,
+            owner_name=row.owner_name,
+            is_shared=row.is_shared,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
         )
-    for p in collab_parents:
-        if p.id not in seen_ids:
-            seen_ids.add(p.id)
-            all_parents.append(
-                ParentOut(
-                    id=p.id,
-                    label=p.label,
-                    children_count=len(p.children),
-                    is_owner=False,
-                    owner_name=p.user.full_name,
-                    is_shared=p.is_shared,
-                    created_at=p.created_at,
-                    updated_at=p.updated_at,
-                )
-            )
-
-    return all_parents
+        for row in rows
+    ]
 
 
 @router.post("/", response_model=ParentOut, status_code=201)
@@ -111,21 +238,75 @@ async def create_parent(
     )
 
 
+MAX_BATCH_IDS = 100
+
+
+@router.get("/details", response_model=list[ParentDetail])
+async def get_parents_batch(
+    ids: list[int] = Query(...),
+    include_audio: bool = False,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    # Details for many decks in one query set; audio URLs are only signed when asked for
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+
+    result = await db.execute(_decks_stmt(Parent.id.in_(ids), _readable_by(user.id)))
+    found = {p.id: p for p in result.scalars().all()}
+
+    details = []
+    for parent_id in dict.fromkeys(ids):
+        parent = found.get(parent_id)
+        if parent is None:
+            continue
+        details.append(
+            ParentDetail(
+                id=parent.id,
+                label=parent.label,
+                children=[
+                    ChildOut(
+                        id=c.id,
+                        name=c.name,
+                        phonetic=c.phonetic,
+                        meaning=c.meaning,
+                        passage=c.passage,
+                        audio_url=presigned_url(c.audio_key) if include_audio else None,
+                        sort_order=c.sort_order,
+                        created_at=c.created_at,
+                    )
+                    for c in parent.children
+                ],
+                is_owner=parent.user_id == user.id,
+                owner_name=parent.user.full_name,
+                is_shared=parent.is_shared,
+                is_collaborator=any(c.user_id == user.id for c in parent.collaborators),
+                collaborator_names=[c.user.username for c in parent.collaborators],
+                created_at=parent.created_at,
+            )
+        )
+    return details
+
+
 @router.get("/{parent_id}", response_model=ParentDetail)
 async def get_parent(
     parent_id: int,
+    request: Request,
+    response: Response,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Parent)
-        .where(Parent.id == parent_id)
-        .options(
-            selectinload(Parent.children),
-            selectinload(Parent.user),
-            selectinload(Parent.collaborators).selectinload(Collaborator.user),
-        )
-    )
+    # Answer If-None-Match from the watermark before loading children or signing URLs
+    mark = (await db.execute(_deck_watermark_stmt(parent_id, user.id))).one_or_none()
+    if mark is not None and (mark.user_id == user.id or mark.is_collaborator or mark.is_shared):
+        etag = make_etag("deck", parent_id, user.id, *mark, presign_epoch())
+        if etag_matches(request, etag):
+            if mark.user_id != user.id and not mark.is_collaborator:
+                _track_view(request, parent_id, user)
+            return not_modified(etag)
+        set_etag(response, etag)
+
+    result = await db.execute(_decks_stmt(Parent.id == parent_id))
     parent = result.scalar_one_or_none()
     if not parent:
         raise HTTPException(status_code=404, detail="Parent not found")
@@ -139,17 +320,7 @@ async def get_parent(
 
     # Track view if user is not the owner and not a collaborator
     if not is_owner and not is_collaborator:
-        one_hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
-        recent_view = await db.execute(
-            select(ParentView).where(
-                ParentView.user_id == user.id,
-                ParentView.parent_id == parent_id,
-                ParentView.viewed_at > one_hour_ago,
-            )
-        )
-        if not recent_view.scalar_one_or_none():
-            db.add(ParentView(user_id=user.id, parent_id=parent_id))
-            await db.commit()
+        _track_view(request, parent_id, user)
 
     children_out = []
     for c in parent.children:
@@ -189,21 +360,24 @@ async def update_parent(
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
-        select(Parent)
-        .where(Parent.id == parent_id, Parent.user_id == user.id)
-        .options(selectinload(Parent.children))
+        select(Parent).where(Parent.id == parent_id, Parent.user_id == user.id)
     )
     parent = result.scalar_one_or_none()
     if not parent:
         raise HTTPException(status_code=404, detail="Parent not found")
 
     parent.label = body.label
+    await event_broker.publish(db, parent_id, "deck")
     await db.commit()
+    await public_deck_cache.invalidate(parent_id)
     await db.refresh(parent)
+    count_result = await db.execute(
+        select(func.count(Child.id)).where(Child.parent_id == parent_id)
+    )
     return ParentOut(
         id=parent.id,
         label=parent.label,
-        children_count=len(parent.children),
+        children_count=count_result.scalar() or 0,
         is_owner=True,
         owner_name=user.full_name,
         is_shared=parent.is_shared,
@@ -212,7 +386,7 @@ async def update_parent(
     )
 
 
-@router.delete("/{parent_id}", status_code=204)
+@router.delete("/{parent_id}", response_model=list[CleanupJobOut], status_code=202)
 async def delete_parent(
     parent_id: int,
     user: User = Depends(get_current_user),
@@ -225,89 +399,188 @@ async def delete_parent(
     if not parent:
         raise HTTPException(status_code=404, detail="Parent not found")
 
-    delete_prefix(f"users/{user.id}/parents/{parent_id}/")
-
+    # Audio is removed by the cleanup worker; the jobs commit with the delete
+    jobs = [CleanupJob(user_id=user.id, prefix=prefix) for prefix in await deck_prefixes(db, [parent_id])]
+    db.add_all(jobs)
     await db.delete(parent)
     await db.commit()
+    cleanup_worker.wake()
+    await public_deck_cache.invalidate(parent_id)
+    for job in jobs:
+        await db.refresh(job)
+    return jobs
 
 
 # ── Public (guest-friendly) view ─────────────────────
+async def _load_public_deck(parent_id: int) -> dict:
+    # Own session: the load may outlive the request that started it (see PublicDeckCache)
+    async with async_session() as db:
+        result = await db.execute(_decks_stmt(Parent.id == parent_id))
+        parent = result.scalar_one_or_none()
+        if not parent:
+            raise HTTPException(status_code=404, detail="Parent not found")
+
+        children_out = [
+            ChildOut(
+                id=c.id,
+                name=c.name,
+                phonetic=c.phonetic,
+                meaning=c.meaning,
+                passage=c.passage,
+                audio_url=presigned_url(c.audio_key),
+                sort_order=c.sort_order,
+                created_at=c.created_at,
+            )
+            for c in parent.children
+        ]
+        deck = PublicParentDetail(
+            id=parent.id,
+            label=parent.label,
+            children=children_out,
+            owner_name=parent.user.full_name,
+            is_shared=parent.is_shared,
+            collaborator_names=[c.user.username for c in parent.collaborators],
+            created_at=parent.created_at,
+        )
+        return deck.model_dump(mode="json", exclude={"is_owner", "is_collaborator", "is_guest"})
+
+
 @router.get("/{parent_id}/public", response_model=PublicParentDetail)
 async def get_parent_public(
     parent_id: int,
+    request: Request,
+    response: Response,
     user: User | None = Depends(get_optional_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Parent)
-        .where(Parent.id == parent_id)
-        .options(
-            selectinload(Parent.children),
-            selectinload(Parent.user),
-            selectinload(Parent.collaborators).selectinload(Collaborator.user),
-        )
-    )
-    parent = result.scalar_one_or_none()
-    if not parent:
+    viewer_id = user.id if user else None
+    mark = (await db.execute(_deck_watermark_stmt(parent_id, viewer_id))).one_or_none()
+    if mark is None:
         raise HTTPException(status_code=404, detail="Parent not found")
-
-    if not parent.is_shared:
+    if not mark.is_shared:
         raise HTTPException(status_code=403, detail="This card has not been shared")
 
     is_guest = user is None
-    is_owner = False if is_guest else parent.user_id == user.id
-    is_collaborator = False if is_guest else any(c.user_id == user.id for c in parent.collaborators)
+    is_owner = mark.user_id == viewer_id
+    is_collaborator = mark.is_collaborator
 
     # Track view for non-owner/non-collaborator (both guests and logged-in users)
     if not is_owner and not is_collaborator:
-        one_hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
-        if is_guest:
-            # For guests, just record (no user_id dedup — throttled by 1h per parent via session/IP in future)
-            db.add(ParentView(user_id=None, parent_id=parent_id))
-            await db.commit()
-        else:
-            recent_view = await db.execute(
-                select(ParentView).where(
-                    ParentView.user_id == user.id,
-                    ParentView.parent_id == parent_id,
-                    ParentView.viewed_at > one_hour_ago,
-                )
-            )
-            if not recent_view.scalar_one_or_none():
-                db.add(ParentView(user_id=user.id, parent_id=parent_id))
-                await db.commit()
+        _track_view(request, parent_id, user)
+
+    etag = make_etag("public-deck", parent_id, viewer_id, *mark, presign_epoch())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    # The watermark doubles as the cache version, so any write produces a fresh entry
+    version = make_etag(
+        mark.user_id,
+        mark.is_shared,
+        mark.updated_at,
+        mark.owner_updated_at,
+        mark.children,
+        mark.collaborators,
+        presign_epoch(),
+    )
+    # Hand the connection back before a possibly shared load that checks out its own
+    await db.close()
+    deck = await public_deck_cache.get_or_load(parent_id, version, lambda: _load_public_deck(parent_id))
+    return PublicParentDetail(
+        **deck, is_owner=is_owner, is_collaborator=is_collaborator, is_guest=is_guest
+    )
 
-    children_out = []
-    for c in parent.children:
-        children_out.append(
-            ChildOut(
-                id=c.id,
-                name=c.name,
-                phonetic=c.phonetic,
-                meaning=c.meaning,
-                passage=c.passage,
-                audio_url=presigned_url(c.audio_key),
-                sort_order=c.sort_order,
-                created_at=c.created_at,
-            )
+
+# ── Live events (server-sent events) ─────────────────
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/{parent_id}/events")
+async def stream_events(
+    parent_id: int,
+    request: Request,
+    user: User | None = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_db),
+):
+    if user is not None:
+        denied = await _read_denied(db, parent_id, user.id)
+        if denied:
+            raise denied
+    else:
+        await _require_shared(db, parent_id)
+
+    queue = event_broker.subscribe(parent_id)
+    if queue is None:
+        raise HTTPException(status_code=503, detail="Too many open event streams")
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=settings.events_heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield _sse(message["event"], message["data"])
+        finally:
+            event_broker.unsubscribe(parent_id, queue)
+
+    # X-Accel-Buffering stops nginx from holding events back
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+REACTION_SAMPLE_SIZE = 5
+
+
+def _reaction_summary_stmt(parent_id: int, viewer_id: int | None):
+    # One counter row per (emoji, user); name only the most recent reactors per emoji
+    ranked = (
+        select(
+            ReactionCount.emoji,
+            ReactionCount.user_id,
+            ReactionCount.count,
+            ReactionCount.updated_at,
+            func.row_number()
+            .over(partition_by=ReactionCount.emoji, order_by=ReactionCount.updated_at.desc())
+            .label("rank"),
         )
+        .where(ReactionCount.parent_id == parent_id, ReactionCount.count > 0)
+        .subquery()
+    )
+    total = func.sum(ranked.c.count)
+    mine = func.coalesce(func.sum(ranked.c.count).filter(ranked.c.user_id == viewer_id), 0)
+    sample = func.array_agg(aggregate_order_by(User.username, ranked.c.updated_at.desc())).filter(
+        ranked.c.rank <= REACTION_SAMPLE_SIZE
+    )
+    return (
+        select(ranked.c.emoji, total, func.count(), mine, sample)
+        .join(User, User.id == ranked.c.user_id)
+        .group_by(ranked.c.emoji)
+        .order_by(total.desc(), ranked.c.emoji)
+    )
 
-    collaborator_names = [c.user.username for c in parent.collaborators]
 
-    return PublicParentDetail(
-        id=parent.id,
-        label=parent.label,
-        children=children_out,
-        is_owner=is_owner,
-        owner_name=parent.user.full_name,
-        is_shared=parent.is_shared,
-        is_collaborator=is_collaborator,
-        collaborator_names=collaborator_names,
-        is_guest=is_guest,
-        created_at=parent.created_at,
+async def _reaction_summary(db: AsyncSession, parent_id: int, viewer_id: int | None) -> ReactionSummary:
+    result = await db.execute(_reaction_summary_stmt(parent_id, viewer_id))
+    reactions = [
+        EmojiCount(emoji=emoji, count=count, user_count=users, my_count=my, usernames=names or [])
+        for emoji, count, users, my, names in result.all()
+    ]
+    return ReactionSummary(
+        parent_id=parent_id, total=sum(r.count for r in reactions), reactions=reactions
     )
 
 
+def _deck_comments_stmt(parent_id: int):
+    return select(Comment).where(Comment.parent_id == parent_id)
+
+
 # ── Public read-only reactions & comments ────────────
 @router.get("/{parent_id}/public/reactions", response_model=list[ReactionOut])
 async def list_reactions_public(
@@ -323,60 +596,33 @@ async def list_reactions_public(
     if not parent.is_shared:
         raise HTTPException(status_code=403, detail="This card has not been shared")
 
-    result = await db.execute(
-        select(Reaction)
-        .where(Reaction.parent_id == parent_id)
-        .options(selectinload(Reaction.user))
-        .order_by(Reaction.created_at.desc())
-    )
-    reactions = result.scalars().all()
-    return [
-        ReactionOut(
-            id=r.id,
-            user_id=r.user_id,
-            username=r.user.username,
-            parent_id=r.parent_id,
-            emoji=r.emoji,
-        )
-        for r in reactions
-    ]
+    return await reaction_rows(db, ReactionCount.parent_id == parent_id)
+
+
+@router.get("/{parent_id}/public/reactions/summary", response_model=ReactionSummary)
+async def reaction_summary_public(
+    parent_id: int,
+    db: AsyncSession = Depends(get_db),
+):
+    await _require_shared(db, parent_id)
+    return await _reaction_summary(db, parent_id, None)
 
 
 @router.get("/{parent_id}/public/comments", response_model=list[CommentOut])
 async def list_comments_public(
     parent_id: int,
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    since: str | None = None,
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Parent).where(Parent.id == parent_id)
-    )
-    parent = result.scalar_one_or_none()
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent not found")
-    if not parent.is_shared:
-        raise HTTPException(status_code=403, detail="This card has not been shared")
+    await _require_shared(db, parent_id)
 
-    result = await db.execute(
-        select(Comment)
-        .where(Comment.parent_id == parent_id)
-        .options(selectinload(Comment.user), selectinload(Comment.parent))
-        .order_by(Comment.created_at.desc())
+    comments = await comment_feed(
+        db, response, _deck_comments_stmt(parent_id), limit, cursor, since
     )
-    comments = result.scalars().all()
-    return [
-        CommentOut(
-            id=c.id,
-            user_id=c.user_id,
-            username=c.user.username,
-            full_name=c.user.full_name,
-            profile_picture_url=presigned_url(c.user.profile_picture) if c.user.profile_picture else None,
-            parent_id=c.parent_id,
-            parent_label=c.parent.label,
-            text=c.text,
-            created_at=c.created_at,
-        )
-        for c in comments
-    ]
+    return not_modified() if comments is None else comments
 
 
 # ── Share toggle ─────────────────────────────────────
@@ -395,6 +641,7 @@ async def toggle_share(
 
     parent.is_shared = not parent.is_shared
     await db.commit()
+    await public_deck_cache.invalidate(parent_id)
     await db.refresh(parent)
     return {"is_shared": parent.is_shared}
 
@@ -423,6 +670,7 @@ async def create_comment(
 
     comment = Comment(user_id=user.id, parent_id=parent_id, text=body.text)
     db.add(comment)
+    await event_broker.publish(db, parent_id, "comment")
     await db.commit()
     await db.refresh(comment)
 
@@ -442,36 +690,105 @@ async def create_comment(
 @router.get("/{parent_id}/comments", response_model=list[CommentOut])
 async def list_comments(
     parent_id: int,
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    since: str | None = None,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Comment)
-        .where(Comment.parent_id == parent_id)
-        .options(selectinload(Comment.user), selectinload(Comment.parent))
-        .order_by(Comment.created_at.desc())
+    # Without limit/cursor/since every comment is returned, newest first
+    comments = await comment_feed(
+        db, response, _deck_comments_stmt(parent_id), limit, cursor, since
     )
-    comments = result.scalars().all()
-    return [
-        CommentOut(
-            id=c.id,
-            user_id=c.user_id,
-            username=c.user.username,
-            full_name=c.user.full_name,
-            profile_picture_url=presigned_url(c.user.profile_picture) if c.user.profile_picture else None,
-            parent_id=c.parent_id,
-            parent_label=c.parent.label,
-            text=c.text,
-            created_at=c.created_at,
-        )
-        for c in comments
-    ]
+    return not_modified() if comments is None else comments
 
 
 # ── Comment Reactions ─────────────────────────────────
 ALLOWED_COMMENT_EMOJIS = ["\u2764\uFE0F", "\U0001F44D", "\U0001F525", "\U0001F60D", "\U0001F4AF"]
 
 
+def _comment_reaction_summaries_stmt(parent_id: int, comment_ids: list[int], viewer_id: int | None):
+    ranked = (
+        select(
+            CommentReaction.comment_id,
+            CommentReaction.emoji,
+            CommentReaction.user_id,
+            CommentReaction.created_at,
+            func.row_number()
+            .over(
+                partition_by=(CommentReaction.comment_id, CommentReaction.emoji),
+                order_by=CommentReaction.created_at.desc(),
+            )
+            .label("rank"),
+        )
+        .join(Comment, Comment.id == CommentReaction.comment_id)
+        .where(Comment.parent_id == parent_id, CommentReaction.comment_id.in_(comment_ids))
+        .subquery()
+    )
+    reacted = func.coalesce(func.bool_or(ranked.c.user_id == viewer_id), False)
+    sample = func.array_agg(aggregate_order_by(User.username, ranked.c.created_at.desc())).filter(
+        ranked.c.rank <= REACTION_SAMPLE_SIZE
+    )
+    return (
+        select(ranked.c.comment_id, ranked.c.emoji, func.count(), reacted, sample)
+        .join(User, User.id == ranked.c.user_id)
+        .group_by(ranked.c.comment_id, ranked.c.emoji)
+    )
+
+
+async def _comment_reaction_summaries(
+    db: AsyncSession, parent_id: int, comment_ids: list[int], viewer_id: int | None
+) -> list[CommentReactionSummary]:
+    if len(comment_ids) > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PAGE_SIZE} comment ids per request")
+
+    result = await db.execute(_comment_reaction_summaries_stmt(parent_id, comment_ids, viewer_id))
+    by_comment = {comment_id: [] for comment_id in dict.fromkeys(comment_ids)}
+    for comment_id, emoji, count, mine, names in result.all():
+        by_comment[comment_id].append(
+            CommentEmojiCount(emoji=emoji, count=count, reacted=mine, usernames=names or [])
+        )
+    return [
+        CommentReactionSummary(comment_id=comment_id, reactions=reactions)
+        for comment_id, reactions in by_comment.items()
+    ]
+
+
+@router.get("/{parent_id}/comments/reactions", response_model=list[CommentReactionSummary])
+async def list_comment_reactions_batch(
+    parent_id: int,
+    ids: list[int] = Query(...),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    denied = await _read_denied(db, parent_id, user.id)
+    if denied:
+        raise denied
+    return await _comment_reaction_summaries(db, parent_id, ids, user.id)
+
+
+@router.get(
+    "/{parent_id}/public/comments/reactions", response_model=list[CommentReactionSummary]
+)
+async def list_comment_reactions_batch_public(
+    parent_id: int,
+    ids: list[int] = Query(...),
+    db: AsyncSession = Depends(get_db),
+):
+    await _require_shared(db, parent_id)
+    return await _comment_reaction_summaries(db, parent_id, ids, None)
+
+
+def _comment_reactions_stmt(comment_id: int):
+    return (
+        select(CommentReaction)
+        .where(CommentReaction.comment_id == comment_id)
+        .options(selectinload(CommentReaction.user))
+        .order_by(CommentReaction.created_at.desc())
+    )
+
+
 @router.post("/{parent_id}/comments/{comment_id}/reactions", status_code=200)
 async def toggle_comment_reaction(
     parent_id: int,
@@ -500,6 +817,7 @@ async def toggle_comment_reaction(
     )
     reaction = existing.scalar_one_or_none()
 
+    await event_broker.publish(db, parent_id, "comment_reaction", {"comment_id": comment_id})
     if reaction:
         await db.delete(reaction)
         await db.commit()
@@ -523,12 +841,7 @@ async def list_comment_reactions(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(CommentReaction)
-        .where(CommentReaction.comment_id == comment_id)
-        .options(selectinload(CommentReaction.user))
-        .order_by(CommentReaction.created_at.desc())
-    )
+    result = await db.execute(_comment_reactions_stmt(comment_id))
     reactions = result.scalars().all()
     return [
         CommentReactionOut(
@@ -559,12 +872,7 @@ async def list_comment_reactions_public(
     if not parent.is_shared:
         raise HTTPException(status_code=403, detail="This card has not been shared")
 
-    result = await db.execute(
-        select(CommentReaction)
-        .where(CommentReaction.comment_id == comment_id)
-        .options(selectinload(CommentReaction.user))
-        .order_by(CommentReaction.created_at.desc())
-    )
+    result = await db.execute(_comment_reactions_stmt(comment_id))
     reactions = result.scalars().all()
     return [
         CommentReactionOut(
@@ -582,6 +890,34 @@ async def list_comment_reactions_public(
 MAX_REACTIONS_PER_EMOJI = 10
 
 
+def _add_reaction_stmt(parent_id: int, user_id: int, emoji: str):
+    # One statement: access check, capped increment and optional history row.
+    # The cap lives in the conflict WHERE, so concurrent taps cannot overshoot it.
+    upsert = pg_insert(ReactionCount).from_select(
+        ["parent_id", "user_id", "emoji", "count"],
+        select(Parent.id, literal(user_id), literal(emoji), literal(1)).where(
+            Parent.id == parent_id, _readable_by(user_id)
+        ),
+    )
+    bumped = (
+        upsert.on_conflict_do_update(
+            index_elements=[ReactionCount.parent_id, ReactionCount.user_id, ReactionCount.emoji],
+            set_={"count": ReactionCount.count + 1, "updated_at": func.now()},
+            where=ReactionCount.count < MAX_REACTIONS_PER_EMOJI,
+        )
+        .returning(ReactionCount.parent_id, ReactionCount.user_id, ReactionCount.emoji, ReactionCount.count)
+        .cte("bumped")
+    )
+    stmt = select(bumped.c.count)
+    if settings.reaction_history_enabled:
+        history = insert(Reaction).from_select(
+            ["parent_id", "user_id", "emoji"],
+            select(bumped.c.parent_id, bumped.c.user_id, bumped.c.emoji),
+        )
+        stmt = stmt.add_cte(history.cte("history"))
+    return stmt
+
+
 @router.post("/{parent_id}/reactions", status_code=200)
 async def add_reaction(
     parent_id: int,
@@ -589,36 +925,51 @@ async def add_reaction(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Parent).where(Parent.id == parent_id).options(selectinload(Parent.collaborators))
-    )
-    parent = result.scalar_one_or_none()
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent not found")
-
-    is_owner = parent.user_id == user.id
-    is_collaborator = any(c.user_id == user.id for c in parent.collaborators)
-    if not is_owner and not is_collaborator and not parent.is_shared:
-        raise HTTPException(status_code=403, detail="This card has not been shared")
-
-    # Count how many times this user already reacted with this emoji
-    from sqlalchemy import func as sa_func
-    count_result = await db.execute(
-        select(sa_func.count(Reaction.id)).where(
-            Reaction.user_id == user.id,
-            Reaction.parent_id == parent_id,
-            Reaction.emoji == body.emoji,
+    result = await db.execute(_add_reaction_stmt(parent_id, user.id, body.emoji))
+    user_count = result.scalar_one_or_none()
+    if user_count is None:
+        # Nothing matched; work out whether access or the count was the reason
+        denied = await _read_denied(db, parent_id, user.id)
+        raise denied or HTTPException(
+            status_code=409, detail="Maximum reactions reached for this emoji"
         )
-    )
-    current_count = count_result.scalar() or 0
 
-    if current_count >= MAX_REACTIONS_PER_EMOJI:
-        raise HTTPException(status_code=409, detail="Maximum reactions reached for this emoji")
-
-    new_reaction = Reaction(user_id=user.id, parent_id=parent_id, emoji=body.emoji)
-    db.add(new_reaction)
+    await event_broker.publish(db, parent_id, "reaction")
     await db.commit()
-    return {"action": "added", "emoji": body.emoji, "user_count": current_count + 1}
+    return {"action": "added", "emoji": body.emoji, "user_count": user_count}
+
+
+def _remove_reaction_stmt(parent_id: int, user_id: int, emoji: str):
+    decremented = (
+        update(ReactionCount)
+        .where(
+            ReactionCount.parent_id == parent_id,
+            ReactionCount.user_id == user_id,
+            ReactionCount.emoji == emoji,
+            ReactionCount.count > 0,
+            exists().where(Parent.id == parent_id, _readable_by(user_id)),
+        )
+        .values(count=ReactionCount.count - 1, updated_at=func.now())
+        .returning(ReactionCount.count)
+        .cte("decremented")
+    )
+    stmt = select(decremented.c.count)
+    if settings.reaction_history_enabled:
+        # Drop the newest history row for this user+parent+emoji
+        latest = (
+            select(Reaction.id)
+            .where(
+                Reaction.user_id == user_id,
+                Reaction.parent_id == parent_id,
+                Reaction.emoji == emoji,
+            )
+            .order_by(Reaction.created_at.desc(), Reaction.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        history = delete(Reaction).where(Reaction.id == latest, exists(select(decremented.c.count)))
+        stmt = stmt.add_cte(history.cte("history"))
+    return stmt
 
 
 @router.delete("/{parent_id}/reactions", status_code=200)
@@ -628,34 +979,15 @@ async def remove_reaction(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    # Access gate
-    parent_result = await db.execute(
-        select(Parent).where(Parent.id == parent_id).options(selectinload(Parent.collaborators))
-    )
-    parent = parent_result.scalar_one_or_none()
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent not found")
-
-    is_owner = parent.user_id == user.id
-    is_collaborator = any(c.user_id == user.id for c in parent.collaborators)
-    if not is_owner and not is_collaborator and not parent.is_shared:
-        raise HTTPException(status_code=403, detail="This card has not been shared")
+    result = await db.execute(_remove_reaction_stmt(parent_id, user.id, body.emoji))
+    user_count = result.scalar_one_or_none()
+    if user_count is None:
+        denied = await _read_denied(db, parent_id, user.id)
+        raise denied or HTTPException(status_code=404, detail="No reaction to remove")
 
-    # Remove one reaction row for this user+parent+emoji
-    result = await db.execute(
-        select(Reaction).where(
-            Reaction.user_id == user.id,
-            Reaction.parent_id == parent_id,
-            Reaction.emoji == body.emoji,
-        ).limit(1)
-    )
-    reaction = result.scalar_one_or_none()
-    if not reaction:
-        raise HTTPException(status_code=404, detail="No reaction to remove")
-
-    await db.delete(reaction)
+    await event_broker.publish(db, parent_id, "reaction")
     await db.commit()
-    return {"action": "removed", "emoji": body.emoji}
+    return {"action": "removed", "emoji": body.emoji, "user_count": user_count}
 
 
 @router.get("/{parent_id}/reactions", response_model=list[ReactionOut])
@@ -664,23 +996,24 @@ async def list_reactions(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Reaction)
-        .where(Reaction.parent_id == parent_id)
-        .options(selectinload(Reaction.user))
-        .order_by(Reaction.created_at.desc())
-    )
-    reactions = result.scalars().all()
-    return [
-        ReactionOut(
-            id=r.id,
-            user_id=r.user_id,
-            username=r.user.username,
-            parent_id=r.parent_id,
-            emoji=r.emoji,
-        )
-        for r in reactions
-    ]
+    denied = await _read_denied(db, parent_id, user.id)
+    if denied:
+        raise denied
+
+    return await reaction_rows(db, ReactionCount.parent_id == parent_id)
+
+
+@router.get("/{parent_id}/reactions/summary", response_model=ReactionSummary)
+async def reaction_summary(
+    parent_id: int,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    denied = await _read_denied(db, parent_id, user.id)
+    if denied:
+        raise denied
+
+    return await _reaction_summary(db, parent_id, user.id)
 
 
 # ── Collaborators ─────────────────────────────────────
@@ -717,6 +1050,7 @@ async def add_collaborator(
     collab = Collaborator(user_id=target_user.id, parent_id=parent_id)
     db.add(collab)
     await db.commit()
+    await public_deck_cache.invalidate(parent_id)
     await db.refresh(collab)
 
     return CollaboratorOut(
@@ -752,6 +1086,7 @@ async def remove_collaborator(
 
     await db.delete(collab)
     await db.commit()
+    await public_deck_cache.invalidate(parent_id)
 
 
 @router.get("/{parent_id}/collaborators", response_model=list[CollaboratorOut])
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import hash_password, verify_password
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, invalidate_user
+from app.http_cache import etag_matches, make_etag, not_modified, presign_epoch, set_etag
 from app.models import User
-from app.s3 import delete_object, presigned_url, upload_audio
+from app.s3 import UploadTooLarge, delete_object, presigned_url, upload_stream
 from app.schemas import PasswordChange, ProfileUpdate, UserResponse
 
 router = APIRouter(prefix="/api/profile", tags=["profile"])
@@ -34,7 +35,11 @@ def _user_response(user: User) -> dict:
 
 
 @router.get("/", response_model=UserResponse)
-async def get_profile(user: User = Depends(get_current_user)):
+async def get_profile(request: Request, response: Response, user: User = Depends(get_current_user)):
+    etag = make_etag("profile", user.id, user.updated_at, user.profile_picture and presign_epoch())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return _user_response(user)
 
 
@@ -63,6 +68,7 @@ async def update_profile(
         setattr(user, key, value)
 
     await db.commit()
+    invalidate_user(user.id)
     await db.refresh(user)
     return _user_response(user)
 
@@ -76,20 +82,24 @@ async def upload_picture(
     if file.content_type not in ALLOWED_IMAGE_TYPES:
         raise HTTPException(status_code=400, detail="Only JPEG, PNG, GIF, and WebP images are allowed")
 
-    data = await file.read()
-    if len(data) > MAX_IMAGE_SIZE:
+    if file.size is not None and file.size > MAX_IMAGE_SIZE:
         raise HTTPException(status_code=400, detail="Image must be under 5 MB")
 
     ext = ALLOWED_IMAGE_TYPES[file.content_type]
     key = f"users/{user.id}/profile/picture.{ext}"
 
+    try:
+        await upload_stream(key, file, file.content_type, MAX_IMAGE_SIZE)
+    except UploadTooLarge:
+        raise HTTPException(status_code=400, detail="Image must be under 5 MB")
+
     # Delete old picture if it exists and has a different key
     if user.profile_picture and user.profile_picture != key:
-        delete_object(user.profile_picture)
+        await delete_object(user.profile_picture)
 
-    upload_audio(key, data, file.content_type)
     user.profile_picture = key
     await db.commit()
+    invalidate_user(user.id)
     await db.refresh(user)
     return _user_response(user)
 
@@ -100,9 +110,10 @@ async def delete_picture(
     db: AsyncSession = Depends(get_db),
 ):
     if user.profile_picture:
-        delete_object(user.profile_picture)
+        await delete_object(user.profile_picture)
         user.profile_picture = None
         await db.commit()
+        invalidate_user(user.id)
         await db.refresh(user)
     return _user_response(user)
 
@@ -113,9 +124,10 @@ async def change_password(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    if not verify_password(body.current_password, user.password_hash):
+    if not await verify_password(body.current_password, user.password_hash):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
 
-    user.password_hash = hash_password(body.new_password)
+    user.password_hash = await hash_password(body.new_password)
     await db.commit()
+    invalidate_user(user.id)
     return {"message": "Password changed successfully"}
@@ -10,12 +10,7 @@ from app.schemas import RecentParentOut
 router = APIRouter(prefix="/api/recent", tags=["recent"])
 
 
-@router.get("/", response_model=list[RecentParentOut])
-async def get_recent_parents(
-    user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-):
-    """Return recently viewed parents that belong to other users."""
+def _recent_parents_stmt(user_id: int):
     children_count = (
         select(func.count(Child.id))
         .where(Child.parent_id == Parent.id)
@@ -23,7 +18,7 @@ async def get_recent_parents(
         .scalar_subquery()
     )
 
-    stmt = (
+    return (
         select(
             Parent.id.label("parent_id"),
             Parent.label,
@@ -34,13 +29,20 @@ async def get_recent_parents(
         )
         .join(Parent, ParentView.parent_id == Parent.id)
         .join(User, Parent.user_id == User.id)
-        .where(ParentView.user_id == user.id)
-        .where(Parent.user_id != user.id)
+        .where(ParentView.user_id == user_id)
+        .where(Parent.user_id != user_id)
         .group_by(Parent.id, Parent.label, Parent.is_shared, User.full_name)
         .order_by(func.max(ParentView.viewed_at).desc())
     )
 
-    result = await db.execute(stmt)
+
+@router.get("/", response_model=list[RecentParentOut])
+async def get_recent_parents(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Return recently viewed parents that belong to other users."""
+    result = await db.execute(_recent_parents_stmt(user.id))
     rows = result.all()
 
     return [
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.params import Depends
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
+from app.http_cache import etag_matches, make_etag, not_modified, presign_epoch, set_etag
 from app.models import Parent, User
 from app.s3 import presigned_url
 from app.schemas import PublicUserProfile
@@ -11,9 +12,18 @@ from app.schemas import PublicUserProfile
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 
+def _profile_stmt(username: str):
+    return select(User).where(User.username == username)
+
+
 @router.get("/{username}", response_model=PublicUserProfile)
-async def get_public_profile(username: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(User).where(User.username == username))
+async def get_public_profile(
+    username: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(_profile_stmt(username))
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -23,6 +33,13 @@ async def get_public_profile(username: str, db: AsyncSession = Depends(get_db)):
     )
     parent_count = count_result.scalar()
 
+    etag = make_etag(
+        "user", user.id, user.updated_at, parent_count, user.profile_picture and presign_epoch()
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
     return PublicUserProfile(
         username=user.username,
         full_name=user.full_name,
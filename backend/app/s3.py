@@ -1,9 +1,23 @@
+import asyncio
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from app.cache import TTLCache
 from app.config import settings
 
 _client = None
+_executor: ThreadPoolExecutor | None = None
+
+# URLs are reused until they are within the refresh margin of their expiry
+_presign_cache = TTLCache(
+    maxsize=settings.s3_presign_cache_size,
+    ttl=max(settings.s3_presigned_expiry - settings.s3_presign_refresh_margin, 0),
+)
 
 
 def _get_client():
@@ -13,6 +27,7 @@ def _get_client():
             "region_name": settings.s3_region,
             "aws_access_key_id": settings.aws_access_key_id or None,
             "aws_secret_access_key": settings.aws_secret_access_key or None,
+            "config": Config(max_pool_connections=settings.s3_max_pool_connections),
         }
         if settings.s3_endpoint_url:
             kwargs["endpoint_url"] = settings.s3_endpoint_url
@@ -20,50 +35,195 @@ def _get_client():
     return _client
 
 
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.s3_max_workers, thread_name_prefix="s3"
+        )
+    return _executor
+
+
+async def _run(func, *args, **kwargs):
+    # boto3 is blocking; run it on the dedicated S3 pool so the event loop stays free
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(func, *args, **kwargs))
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
 def build_key(user_id: int, parent_id: int, child_id: int, ext: str) -> str:
     return f"users/{user_id}/parents/{parent_id}/children/{child_id}/audio.{ext}"
 
 
-def upload_audio(key: str, data: bytes, content_type: str) -> None:
-    _get_client().put_object(
+async def upload_audio(key: str, data: bytes, content_type: str) -> None:
+    await _run(
+        _get_client().put_object,
         Bucket=settings.s3_bucket,
         Key=key,
         Body=data,
         ContentType=content_type,
     )
+    _presign_cache.invalidate(key)
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+async def upload_stream(key: str, file, content_type: str, max_size: int) -> int:
+    """Copy ``file`` to S3 one chunk at a time and return its size.
+
+    ``file`` is anything with an async ``read(n)`` that only returns fewer than
+    ``n`` bytes at its end. A short first chunk goes up as a single PUT;
+    anything longer becomes a multipart upload. Only one chunk is held in
+    memory. UploadTooLarge is raised, and the multipart upload aborted, once
+    more than ``max_size`` bytes have been read, so nothing past the cap is
+    sent to S3. For an UploadFile the request body has already been received
+    and spooled by the form parser; this bounds the S3 side, not the request.
+    """
+    client = _get_client()
+    chunk_size = settings.s3_multipart_chunk_size
+
+    chunk = await file.read(chunk_size)
+    total = len(chunk)
+    if total > max_size:
+        raise UploadTooLarge()
+
+    if len(chunk) < chunk_size:
+        await _run(
+            client.put_object,
+            Bucket=settings.s3_bucket,
+            Key=key,
+            Body=chunk,
+            ContentType=content_type,
+        )
+        _presign_cache.invalidate(key)
+        return total
+
+    resp = await _run(
+        client.create_multipart_upload,
+        Bucket=settings.s3_bucket,
+        Key=key,
+        ContentType=content_type,
+    )
+    upload_id = resp["UploadId"]
+    parts = []
+    try:
+        while chunk:
+            part_number = len(parts) + 1
+            resp = await _run(
+                client.upload_part,
+                Bucket=settings.s3_bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=chunk,
+            )
+            parts.append({"ETag": resp["ETag"], "PartNumber": part_number})
+            chunk = await file.read(chunk_size) if len(chunk) == chunk_size else b""
+            total += len(chunk)
+            if total > max_size:
+                raise UploadTooLarge()
+        await _run(
+            client.complete_multipart_upload,
+            Bucket=settings.s3_bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except BaseException:
+        try:
+            await _run(
+                client.abort_multipart_upload,
+                Bucket=settings.s3_bucket,
+                Key=key,
+                UploadId=upload_id,
+            )
+        except ClientError:
+            pass
+        raise
+    _presign_cache.invalidate(key)
+    return total
+
+
+async def stream_object(key: str, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+    """Yield an object's bytes a chunk at a time. ClientError (e.g. NoSuchKey)
+    surfaces on the first iteration, before anything has been yielded."""
+    resp = await _run(_get_client().get_object, Bucket=settings.s3_bucket, Key=key)
+    body = resp["Body"]
+    try:
+        while chunk := await _run(body.read, chunk_size):
+            yield chunk
+    finally:
+        body.close()
 
 
 def presigned_url(key: str) -> str | None:
+    # Signing is local HMAC work with no network round-trip, so it stays synchronous
     if not key:
         return None
+    url = _presign_cache.get(key)
+    if url is not None:
+        return url
     try:
-        return _get_client().generate_presigned_url(
+        url = _get_client().generate_presigned_url(
             "get_object",
             Params={"Bucket": settings.s3_bucket, "Key": key},
             ExpiresIn=settings.s3_presigned_expiry,
         )
     except ClientError:
         return None
+    if _presign_cache.ttl > 0:
+        _presign_cache.set(key, url)
+    return url
+
+
+def presign_cache_stats() -> dict:
+    return _presign_cache.stats()
 
 
-def delete_object(key: str) -> None:
+async def delete_object(key: str) -> None:
     if not key:
         return
     try:
-        _get_client().delete_object(Bucket=settings.s3_bucket, Key=key)
+        await _run(_get_client().delete_object, Bucket=settings.s3_bucket, Key=key)
     except ClientError:
         pass
+    _presign_cache.invalidate(key)
 
 
-def delete_prefix(prefix: str) -> None:
+DELETE_BATCH_SIZE = 1000  # most keys one DeleteObjects call accepts
+
+
+async def list_keys(prefix: str) -> AsyncIterator[list[str]]:
+    """Yield the keys under ``prefix`` a page (up to 1000) at a time."""
     client = _get_client()
-    try:
-        resp = client.list_objects_v2(Bucket=settings.s3_bucket, Prefix=prefix)
-        objects = resp.get("Contents", [])
-        if objects:
-            client.delete_objects(
-                Bucket=settings.s3_bucket,
-                Delete={"Objects": [{"Key": o["Key"]} for o in objects]},
-            )
-    except ClientError:
-        pass
+    kwargs = {"Bucket": settings.s3_bucket, "Prefix": prefix, "MaxKeys": DELETE_BATCH_SIZE}
+    while True:
+        resp = await _run(client.list_objects_v2, **kwargs)
+        keys = [o["Key"] for o in resp.get("Contents", [])]
+        if keys:
+            yield keys
+        if not resp.get("IsTruncated"):
+            return
+        kwargs["ContinuationToken"] = resp["NextContinuationToken"]
+
+
+async def delete_keys(keys: list[str]) -> list[str]:
+    """Delete up to DELETE_BATCH_SIZE keys in one request; returns the keys S3
+    reported as not deleted."""
+    resp = await _run(
+        _get_client().delete_objects,
+        Bucket=settings.s3_bucket,
+        Delete={"Objects": [{"Key": k} for k in keys], "Quiet": True},
+    )
+    failed = [e["Key"] for e in resp.get("Errors", [])]
+    for key in set(keys).difference(failed):
+        _presign_cache.invalidate(key)
+    return failed
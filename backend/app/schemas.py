@@ -145,6 +145,24 @@ class ChildUpdate(BaseModel):
     sort_order: int | None = None
 
 
+class ChildMove(BaseModel):
+    after_id: int | None = None  # None moves the card to the top
+
+
+class ChildOrder(BaseModel):
+    child_ids: list[int]
+
+
+class ChildBulkItem(ChildCreate):
+    audio_index: int | None = None  # position of this item's file among the `audio` parts
+
+
+class ChildBulkResult(BaseModel):
+    index: int
+    child: ChildOut
+    audio_error: str | None = None
+
+
 # ── Recent ───────────────────────────────────────────
 class RecentParentOut(BaseModel):
     parent_id: int
@@ -170,6 +188,16 @@ class AnalyticsSummary(BaseModel):
     shared_parents: list[SharedParentSummary]
 
 
+class ViewSeries(BaseModel):
+    # Bucket i starts at start + i * granularity (UTC)
+    parent_id: int
+    granularity: str
+    start: datetime
+    view_count: list[int]
+    user_view_count: list[int]
+    guest_view_count: list[int]
+
+
 # ── Comments ──────────────────────────────────────────
 class CommentCreate(BaseModel):
     text: str
@@ -193,11 +221,33 @@ class ReactionToggle(BaseModel):
 
 
 class ReactionOut(BaseModel):
-    id: int
+    # One row per user and emoji; count is that user's taps
     user_id: int
     username: str
     parent_id: int
     emoji: str
+    count: int
+    updated_at: datetime
+
+
+class ReactionTotal(BaseModel):
+    parent_id: int
+    emoji: str
+    count: int
+
+
+class EmojiCount(BaseModel):
+    emoji: str
+    count: int
+    user_count: int
+    my_count: int
+    usernames: list[str]
+
+
+class ReactionSummary(BaseModel):
+    parent_id: int
+    total: int
+    reactions: list[EmojiCount]
 
 
 # ── Comment Reactions ────────────────────────────────
@@ -213,6 +263,18 @@ class CommentReactionOut(BaseModel):
     emoji: str
 
 
+class CommentEmojiCount(BaseModel):
+    emoji: str
+    count: int
+    reacted: bool
+    usernames: list[str]
+
+
+class CommentReactionSummary(BaseModel):
+    comment_id: int
+    reactions: list[CommentEmojiCount]
+
+
 # ── Collaborators ─────────────────────────────────────
 class CollaboratorAdd(BaseModel):
     username: str
@@ -233,3 +295,18 @@ class PublicUserProfile(BaseModel):
     profile_picture_url: str | None = None
     created_at: datetime
     parent_count: int
+
+
+# ── Cleanup jobs ─────────────────────────────────────
+class CleanupJobOut(BaseModel):
+    id: int
+    prefix: str
+    status: str
+    deleted_count: int
+    attempts: int
+    last_error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: datetime | None = None
+
+    model_config = {"from_attributes": True}
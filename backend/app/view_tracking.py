@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from fastapi import Request
+from sqlalchemy import Date, DateTime, Integer, cast, column, exists, func, insert, literal_column, or_, select, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.config import settings
+from app.database import async_session
+from app.models import Parent, ParentView, ParentViewDaily, ParentViewHourly, User
+
+logger = logging.getLogger(__name__)
+
+DEDUP_WINDOW = 3600  # a viewer counts once per deck per hour
+
+
+class RotatingBloomFilter:
+    """Approximate set membership over a sliding time window with fixed memory.
+
+    Items are added to the current generation and looked up in both; the older
+    generation is discarded every ``window`` seconds, so a member is remembered
+    for between one and two windows.
+    """
+
+    def __init__(self, bits: int, hashes: int, window: float):
+        self.bits = bits
+        self.hashes = hashes
+        self.window = window
+        self._current = bytearray((bits + 7) // 8)
+        self._previous = bytearray((bits + 7) // 8)
+        self._rotated_at = time.monotonic()
+
+    def _positions(self, item: bytes) -> list[int]:
+        # Double hashing: k positions derived from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def _maybe_rotate(self) -> None:
+        now = time.monotonic()
+        if now - self._rotated_at >= self.window:
+            if now - self._rotated_at >= 2 * self.window:
+                self._previous = bytearray(len(self._current))
+            else:
+                self._previous = self._current
+            self._current = bytearray(len(self._previous))
+            self._rotated_at = now
+
+    def add_if_absent(self, item: bytes) -> bool:
+        """Record ``item``; return False if it was (probably) already present."""
+        self._maybe_rotate()
+        positions = self._positions(item)
+        if all(self._current[p >> 3] & (1 << (p & 7)) for p in positions) or all(
+            self._previous[p >> 3] & (1 << (p & 7)) for p in positions
+        ):
+            return False
+        for p in positions:
+            self._current[p >> 3] |= 1 << (p & 7)
+        return True
+
+
+def guest_fingerprint(request: Request, parent_id: int) -> bytes:
+    # nginx passes the client address in X-Real-IP; fall back to the socket peer
+    ip = request.headers.get("x-real-ip") or (request.client.host if request.client else "")
+    user_agent = request.headers.get("user-agent", "")
+    return hmac.new(
+        settings.jwt_secret.encode(),
+        f"{parent_id}|{ip}|{user_agent}".encode(),
+        hashlib.sha256,
+    ).digest()
+
+
+def _rollup_upsert(model, bucket: str, bucket_expr, inserted):
+    user_views = func.count(inserted.c.user_id)
+    stmt = pg_insert(model).from_select(
+        ["parent_id", bucket, "view_count", "user_view_count", "guest_view_count"],
+        select(inserted.c.parent_id, bucket_expr, func.count(), user_views, func.count() - user_views)
+        .group_by(inserted.c.parent_id, bucket_expr),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[model.parent_id, getattr(model, bucket)],
+        set_={
+            "view_count": model.view_count + stmt.excluded.view_count,
+            "user_view_count": model.user_view_count + stmt.excluded.user_view_count,
+            "guest_view_count": model.guest_view_count + stmt.excluded.guest_view_count,
+        },
+    )
+
+
+class ViewRecorder:
+    """Buffers deck views in memory and writes them to parent_views in batches."""
+
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        max_pending: int,
+        max_tracked: int,
+        guest_filter: RotatingBloomFilter,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_tracked = max_tracked
+        self.guest_filter = guest_filter
+        self._pending: list[dict] = []
+        self._recent: OrderedDict[tuple[int, int], float] = OrderedDict()
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self._stats = {"recorded": 0, "deduped": 0, "dropped": 0, "flushed": 0, "flush_errors": 0}
+
+    def record(self, parent_id: int, user_id: int | None, fingerprint: bytes | None = None) -> None:
+        now = time.monotonic()
+        if user_id is None and fingerprint is not None:
+            if not self.guest_filter.add_if_absent(fingerprint):
+                self._stats["deduped"] += 1
+                return
+        elif user_id is not None:
+            key = (parent_id, user_id)
+            seen = self._recent.get(key)
+            if seen is not None and now - seen < DEDUP_WINDOW:
+                self._stats["deduped"] += 1
+                return
+            self._recent[key] = now
+            self._recent.move_to_end(key)
+            self._prune(now)
+
+        if len(self._pending) >= self.max_pending:
+            self._stats["dropped"] += 1
+            return
+        self._pending.append(
+            {"parent_id": parent_id, "user_id": user_id, "viewed_at": datetime.now(timezone.utc)}
+        )
+        self._stats["recorded"] += 1
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _prune(self, now: float) -> None:
+        # Entries are kept in last-seen order, so expired ones sit at the front
+        while self._recent:
+            key, seen = next(iter(self._recent.items()))
+            if now - seen < DEDUP_WINDOW and len(self._recent) <= self.max_tracked:
+                break
+            self._recent.popitem(last=False)
+
+    async def flush(self) -> None:
+        while self._pending:
+            batch = self._pending[: self.batch_size]
+            del self._pending[: self.batch_size]
+            try:
+                async with async_session() as db:
+                    await self._write(db, batch)
+                    await db.commit()
+            except Exception:
+                logger.exception("Failed to flush %d parent views", len(batch))
+                self._stats["flush_errors"] += 1
+                room = self.max_pending - len(self._pending)
+                self._pending[:0] = batch[:room]
+                self._stats["dropped"] += max(len(batch) - room, 0)
+                return
+            self._stats["flushed"] += len(batch)
+
+    async def _write(self, db, batch: list[dict]) -> None:
+        rows = values(
+            column("parent_id", Integer),
+            column("user_id", Integer),
+            column("viewed_at", DateTime(timezone=True)),
+            name="v",
+        ).data([(r["parent_id"], r["user_id"], r["viewed_at"]) for r in batch])
+        # An all-guest batch renders user_id as bare NULLs, which Postgres types as text
+        user_id = cast(rows.c.user_id, Integer)
+        # Skip views of decks or users deleted since the view was buffered
+        inserted = (
+            insert(ParentView)
+            .from_select(
+                ["parent_id", "user_id", "viewed_at"],
+                select(rows.c.parent_id, user_id, rows.c.viewed_at).where(
+                    exists().where(Parent.id == rows.c.parent_id),
+                    or_(user_id.is_(None), exists().where(User.id == user_id)),
+                ),
+            )
+            .returning(ParentView.parent_id, ParentView.user_id, ParentView.viewed_at)
+            .cte("inserted")
+        )
+
+        # Fold exactly the rows that were inserted into the rollups, in the same statement
+        utc = literal_column("'UTC'")
+        day = cast(func.timezone(utc, inserted.c.viewed_at), Date)
+        hour = func.date_trunc(literal_column("'hour'"), inserted.c.viewed_at, utc)
+        daily = _rollup_upsert(ParentViewDaily, "day", day, inserted).cte("daily")
+        hourly = _rollup_upsert(ParentViewHourly, "hour", hour, inserted)
+        await db.execute(hourly.add_cte(inserted, daily))
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # Let an in-progress flush finish rather than cancelling it mid-write
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {**self._stats, "pending": len(self._pending), "tracked_viewers": len(self._recent)}
+
+
+view_recorder = ViewRecorder(
+    batch_size=settings.view_batch_size,
+    flush_interval=settings.view_flush_interval,
+    max_pending=settings.view_max_pending,
+    max_tracked=settings.view_dedup_max_tracked,
+    guest_filter=RotatingBloomFilter(
+        bits=settings.guest_view_bloom_bits,
+        hashes=settings.guest_view_bloom_hashes,
+        window=DEDUP_WINDOW,
+    ),
+)
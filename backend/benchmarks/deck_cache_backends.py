@@ -0,0 +1,115 @@
+"""
+Behaviour check for the public deck cache backends.
+
+Runs the same scenario (miss, hit, version change, invalidation, coalesced
+concurrent misses, backend outage) against the memory backend and against
+RedisBackend wrapping an in-process stand-in for a redis.asyncio client, so
+the Redis code path is exercised without a Redis server.
+
+Usage:
+  python benchmarks/deck_cache_backends.py   # exits 1 if any check fails
+
+Assumes:
+  - Nothing beyond the backend requirements; no database, S3 or Redis needed
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+
+# Ensure app is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.deck_cache import MemoryBackend, PublicDeckCache, RedisBackend
+
+
+class FakeRedis:
+    """The slice of redis.asyncio.Redis that RedisBackend uses, with ``ex`` expiry."""
+
+    def __init__(self):
+        self.data: dict[str, tuple[str, float | None]] = {}
+        self.down = False
+
+    def _check(self) -> None:
+        if self.down:
+            raise ConnectionError("fake redis is down")
+
+    async def get(self, key: str) -> str | None:
+        self._check()
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self._check()
+        self.data[key] = (value, time.monotonic() + ex if ex else None)
+
+    async def delete(self, key: str) -> None:
+        self._check()
+        self.data.pop(key, None)
+
+
+async def scenario(cache: PublicDeckCache, outage) -> list[str]:
+    failures = []
+    loads = 0
+
+    async def load(body: str = "v1"):
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        return {"label": body}
+
+    def check(name: str, ok: bool) -> None:
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+        if not ok:
+            failures.append(name)
+
+    check("miss loads", await cache.get_or_load(1, "a", load) == {"label": "v1"} and loads == 1)
+    check("hit skips load", await cache.get_or_load(1, "a", load) == {"label": "v1"} and loads == 1)
+    check("new version reloads", await cache.get_or_load(1, "b", lambda: load("v2")) == {"label": "v2"} and loads == 2)
+    await cache.invalidate(1)
+    await cache.get_or_load(1, "b", load)
+    check("invalidate forces a load", loads == 3)
+
+    await cache.invalidate(2)
+    before = loads
+    bodies = await asyncio.gather(*(cache.get_or_load(2, "a", load) for _ in range(20)))
+    check("concurrent misses share one load", loads - before == 1 and all(b == {"label": "v1"} for b in bodies))
+
+    if outage is not None:
+        outage(True)
+        before = loads
+        body = await cache.get_or_load(3, "a", load)
+        await cache.invalidate(3)
+        outage(False)
+        check("outage falls back to loading", body == {"label": "v1"} and loads - before == 1)
+        check("outage is counted", cache.stats()["errors"] >= 2)
+    return failures
+
+
+async def run() -> int:
+    # The outage checks trigger the cache's own warnings on purpose
+    logging.getLogger("app.deck_cache").setLevel(logging.ERROR)
+    failures = []
+    print("memory backend")
+    failures += await scenario(PublicDeckCache(MemoryBackend(maxsize=10, ttl=60), ttl=60), None)
+
+    fake = FakeRedis()
+    print("\nredis backend (stand-in client)")
+    failures += await scenario(PublicDeckCache(RedisBackend(fake), ttl=60), lambda down: setattr(fake, "down", down))
+    expiry = [expires for _, expires in fake.data.values()]
+    ok = bool(expiry) and all(e is not None for e in expiry)
+    print(f"{'ok  ' if ok else 'FAIL'} entries are written with a TTL")
+    if not ok:
+        failures.append("ttl")
+
+    print(f"\n{len(failures)} failure(s)" if failures else "\nAll checks passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run()))
@@ -0,0 +1,110 @@
+"""
+Benchmark: GET /api/parents/ latency and memory as deck size grows.
+
+Creates a throwaway user owning --decks decks, grows every deck through the
+given sizes, and calls the list_parents route directly at each size. Latency
+and peak Python allocations should stay flat because only child counts are
+read, never the child rows themselves.
+
+Usage:
+  python benchmarks/list_parents.py --decks 20 --sizes 10 100 1000 --repeat 20
+
+Assumes:
+  - DATABASE_URL points at a migrated scratch database
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+
+from fastapi import Response
+from sqlalchemy import delete, func, insert, select
+
+# Ensure app is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database import async_session, engine
+from app.models import Child, Parent, User
+from app.ranking import keys_between
+from app.routers.parent_routes import list_parents
+
+
+async def run(decks: int, sizes: list[int], repeat: int):
+    suffix = uuid.uuid4().hex[:8]
+    async with async_session() as db:
+        user = User(
+            full_name="Bench User",
+            email=f"bench-{suffix}@example.com",
+            country="Nigeria",
+            username=f"bench-{suffix}",
+            password_hash="x",
+        )
+        db.add(user)
+        await db.flush()
+        parents = [Parent(user_id=user.id, label=f"Deck {i}") for i in range(decks)]
+        db.add_all(parents)
+        await db.commit()
+
+        try:
+            current = 0
+            ranks = keys_between(None, None, max(sizes))
+            for size in sorted(sizes):
+                rows = [
+                    {
+                        "parent_id": p.id,
+                        "name": f"Name {i}",
+                        "meaning": "meaning " * 50,
+                        "sort_order": i,
+                        "rank": ranks[i],
+                    }
+                    for p in parents
+                    for i in range(current, size)
+                ]
+                if rows:
+                    await db.execute(insert(Child), rows)
+                    await db.commit()
+                current = size
+
+                timings = []
+                peaks = []
+                for _ in range(repeat):
+                    tracemalloc.start()
+                    t0 = time.perf_counter()
+                    result = await list_parents(
+                        response=Response(), limit=None, cursor=None, user=user, db=db
+                    )
+                    timings.append(time.perf_counter() - t0)
+                    peaks.append(tracemalloc.get_traced_memory()[1])
+                    tracemalloc.stop()
+
+                total = (
+                    await db.execute(
+                        select(func.count(Child.id)).join(Parent).where(Parent.user_id == user.id)
+                    )
+                ).scalar()
+                ms = sorted(t * 1000 for t in timings)
+                print(
+                    f"children/deck={size:>6} total_children={total:>8} decks={len(result)} "
+                    f"p50={statistics.median(ms):.2f}ms max={ms[-1]:.2f}ms "
+                    f"peak_alloc={max(peaks) / 1024:.0f}KiB"
+                )
+        finally:
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.commit()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="list_parents latency/memory vs deck size")
+    parser.add_argument("--decks", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.decks, args.sizes, args.repeat))
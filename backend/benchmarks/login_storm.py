@@ -0,0 +1,116 @@
+"""
+Benchmark: latency of an unrelated endpoint while a login storm is running.
+
+Fires concurrent logins at a running API and, at the same time, probes
+/api/health. With argon2 on the event loop the probe's p99 tracks the hash
+time multiplied by the queue depth; with the hashing pool it stays flat.
+
+Usage:
+  python benchmarks/login_storm.py --base-url http://localhost:8000 \\
+      --username bench --password Bench1234 --logins 200 --concurrency 32
+
+Assumes:
+  - The API is running (uvicorn app.main:app --port 8000)
+  - The user exists (register it via the app or pass --register)
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _post_json(url: str, payload: dict) -> int:
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def probe(base_url: str, stop: threading.Event, latencies: list[float]):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        with urllib.request.urlopen(f"{base_url}/api/health") as resp:
+            resp.read()
+        latencies.append(time.perf_counter() - t0)
+        time.sleep(0.01)
+
+
+def run(base_url: str, username: str, password: str, logins: int, concurrency: int):
+    stop = threading.Event()
+    latencies: list[float] = []
+
+    # Baseline with no login traffic
+    baseline: list[float] = []
+    probe_thread = threading.Thread(target=probe, args=(base_url, stop, baseline))
+    probe_thread.start()
+    time.sleep(2)
+    stop.set()
+    probe_thread.join()
+
+    stop.clear()
+    probe_thread = threading.Thread(target=probe, args=(base_url, stop, latencies))
+    probe_thread.start()
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        codes = list(
+            pool.map(
+                lambda _: _post_json(
+                    f"{base_url}/api/auth/login", {"username": username, "password": password}
+                ),
+                range(logins),
+            )
+        )
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    probe_thread.join()
+
+    ok = sum(1 for c in codes if c == 200)
+    print(f"logins={logins} ok={ok} concurrency={concurrency} wall={elapsed:.2f}s "
+          f"throughput={logins / elapsed:.1f}/s")
+    for label, values in (("idle", baseline), ("storm", latencies)):
+        ms = [v * 1000 for v in values] or [0.0]
+        print(f"/api/health {label}: samples={len(values)} p50={statistics.median(ms):.1f}ms "
+              f"p99={_percentile(ms, 0.99):.1f}ms max={max(ms):.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Login storm vs unrelated endpoint latency")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="bench")
+    parser.add_argument("--password", default="Bench1234")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--register", action="store_true", help="Register the user first")
+    args = parser.parse_args()
+
+    if args.register:
+        _post_json(
+            f"{args.base_url}/api/auth/register",
+            {
+                "full_name": "Bench User",
+                "email": f"{args.username}@example.com",
+                "country": "Nigeria",
+                "username": args.username,
+                "password": args.password,
+            },
+        )
+
+    run(args.base_url, args.username, args.password, args.logins, args.concurrency)
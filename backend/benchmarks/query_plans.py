@@ -0,0 +1,198 @@
+"""
+Query-plan regression check: EXPLAIN the hot route queries and fail on
+sequential scans of large tables.
+
+Usage:
+  python benchmarks/query_plans.py --seed   # first run: fill a scratch DB
+  python benchmarks/query_plans.py          # exits 1 if any plan regresses
+
+Assumes:
+  - DATABASE_URL points at a scratch Postgres database (never production;
+    --seed inserts hundreds of thousands of synthetic rows)
+  - The database is migrated (alembic upgrade head)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, text
+
+# Ensure app is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.cleanup import _deck_prefixes_stmt
+from app.comment_feed import comment_feed_stmt
+from app.database import engine
+from app.models import Child, Collaborator, Comment, Parent, ReactionCount, User
+from app.reaction_feed import reaction_rows_stmt
+from app.routers.analytics_routes import (
+    _names_created_stmt,
+    _owned_comments_stmt,
+    _reaction_totals_stmt,
+    _shared_parents_stmt,
+    _view_series_stmt,
+)
+from app.routers.child_routes import _deck_order_stmt, _following_rank_stmt
+from app.routers.parent_routes import (
+    _add_reaction_stmt,
+    _comment_reaction_summaries_stmt,
+    _comment_reactions_stmt,
+    _deck_comments_stmt,
+    _deck_watermark_stmt,
+    _decks_stmt,
+    _list_parents_stmt,
+    _reaction_summary_stmt,
+    _readable_by,
+    _remove_reaction_stmt,
+)
+from app.routers.recent_routes import _recent_parents_stmt
+from app.routers.user_routes import _profile_stmt
+
+# Tables that grow with usage; a sequential scan on any of them is a regression
+LARGE_TABLES = {
+    "users",
+    "parents",
+    "children",
+    "parent_views",
+    "parent_view_daily",
+    "parent_view_hourly",
+    "collaborators",
+    "comments",
+    "reactions",
+    "reaction_counts",
+    "comment_reactions",
+}
+
+SEED_SQL = [
+    """INSERT INTO users (full_name, email, country, username, password_hash)
+       SELECT 'Plan User ' || g, 'plan' || g || '@example.com', 'Nigeria', 'plan' || g, 'x'
+       FROM generate_series(1, 5000) g""",
+    """INSERT INTO parents (user_id, label, is_shared)
+       SELECT u.id, 'Deck ' || g, g % 2 = 0
+       FROM generate_series(1, 10) g CROSS JOIN users u WHERE u.username LIKE 'plan%'""",
+    """INSERT INTO children (parent_id, name, meaning, sort_order, rank)
+       SELECT p.id, 'Name ' || g, repeat('meaning ', 20), g, lpad(g::text, 8, '0') || 'V'
+       FROM generate_series(1, 20) g CROSS JOIN parents p""",
+    """INSERT INTO collaborators (user_id, parent_id)
+       SELECT p.user_id % 5000 + 1, p.id FROM parents p WHERE p.id % 7 = 0
+       ON CONFLICT DO NOTHING""",
+    """INSERT INTO parent_views (user_id, parent_id, viewed_at)
+       SELECT CASE WHEN g % 3 = 0 THEN NULL ELSE (g % 5000) + 1 END,
+              (SELECT min(id) FROM parents) + (g % 50000),
+              now() - (g % 2000) * interval '1 hour'
+       FROM generate_series(1, 500000) g""",
+    """INSERT INTO parent_view_daily (parent_id, day, view_count, user_view_count, guest_view_count)
+       SELECT parent_id, (viewed_at AT TIME ZONE 'UTC')::date, count(*), count(user_id), count(*) - count(user_id)
+       FROM parent_views GROUP BY 1, 2 ON CONFLICT DO NOTHING""",
+    """INSERT INTO parent_view_hourly (parent_id, hour, view_count, user_view_count, guest_view_count)
+       SELECT parent_id, date_trunc('hour', viewed_at, 'UTC'), count(*), count(user_id), count(*) - count(user_id)
+       FROM parent_views GROUP BY 1, 2 ON CONFLICT DO NOTHING""",
+    """INSERT INTO comments (user_id, parent_id, text)
+       SELECT (g % 5000) + 1, (SELECT min(id) FROM parents) + (g % 50000), 'comment ' || g
+       FROM generate_series(1, 200000) g""",
+    """INSERT INTO reactions (user_id, parent_id, emoji)
+       SELECT (g % 5000) + 1, (SELECT min(id) FROM parents) + (g % 50000), 'e' || (g % 12)
+       FROM generate_series(1, 300000) g""",
+    """INSERT INTO reaction_counts (parent_id, user_id, emoji, count)
+       SELECT parent_id, user_id, emoji, least(count(*), 10)
+       FROM reactions GROUP BY 1, 2, 3 ON CONFLICT DO NOTHING""",
+    """INSERT INTO comment_reactions (user_id, comment_id, emoji)
+       SELECT (g % 5000) + 1, (SELECT min(id) FROM comments) + (g % 200000), 'e' || (g % 5)
+       FROM generate_series(1, 200000) g ON CONFLICT DO NOTHING""",
+]
+
+
+def route_queries(user_id: int, parent_id: int, comment_id: int) -> dict:
+    # The routes' own statement builders, so a plan here is the plan the route gets
+    now = datetime.now(timezone.utc)
+    newest = (now, 2**31 - 1)
+    return {
+        "list_parents": _list_parents_stmt(user_id),
+        "list_parents.page": _list_parents_stmt(user_id, newest, 13),
+        "get_parent.watermark": _deck_watermark_stmt(parent_id, user_id),
+        "get_parent": _decks_stmt(Parent.id == parent_id),
+        "get_parents.batch": _decks_stmt(Parent.id.in_([parent_id, parent_id + 1]), _readable_by(user_id)),
+        # Issued by the selectinload options of _decks_stmt
+        "get_parent.children": select(Child).where(Child.parent_id.in_([parent_id])).order_by(Child.rank),
+        "get_parent.collaborators": select(Collaborator).where(Collaborator.parent_id.in_([parent_id])),
+        "move_child.following": _following_rank_stmt(parent_id, 0, "00000005V"),
+        "move_child.renumber": _deck_order_stmt(parent_id, 0),
+        "delete_parent.prefixes": _deck_prefixes_stmt([parent_id]),
+        "list_comments": comment_feed_stmt(_deck_comments_stmt(parent_id), None),
+        "list_comments.page": comment_feed_stmt(_deck_comments_stmt(parent_id), 10, after=newest),
+        "list_comments.since": comment_feed_stmt(
+            _deck_comments_stmt(parent_id), None, since=(now - timedelta(minutes=1), 0)
+        ),
+        "add_reaction": _add_reaction_stmt(parent_id, user_id, "e1"),
+        "remove_reaction": _remove_reaction_stmt(parent_id, user_id, "e1"),
+        "reactions.summary": _reaction_summary_stmt(parent_id, user_id),
+        "list_reactions": reaction_rows_stmt(ReactionCount.parent_id == parent_id),
+        "comment_reactions.summary": _comment_reaction_summaries_stmt(parent_id, [comment_id], user_id),
+        "list_comment_reactions": _comment_reactions_stmt(comment_id),
+        "analytics.names": _names_created_stmt(user_id),
+        "analytics.summary": _shared_parents_stmt(user_id),
+        "analytics.view_series.day": _view_series_stmt(parent_id, "day", now - timedelta(days=29), now),
+        "analytics.view_series.hour": _view_series_stmt(parent_id, "hour", now - timedelta(hours=47), now),
+        "analytics.comments": comment_feed_stmt(_owned_comments_stmt(user_id), None),
+        "analytics.comments.reactions": reaction_rows_stmt(Parent.user_id == user_id),
+        "analytics.reactions": _reaction_totals_stmt(user_id),
+        "recent": _recent_parents_stmt(user_id),
+        "users.by_username": _profile_stmt("plan1"),
+    }
+
+
+def seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+async def run(seed: bool) -> int:
+    async with engine.begin() as conn:
+        if seed:
+            for sql in SEED_SQL:
+                await conn.execute(text(sql))
+            print("Seeded synthetic data")
+        await conn.execute(text("ANALYZE"))
+
+    async with engine.connect() as conn:
+        user_id = (await conn.execute(select(func.min(User.id)).where(User.username.like("plan%")))).scalar()
+        parent_id = (await conn.execute(select(func.min(Parent.id)).where(Parent.user_id == user_id))).scalar()
+        comment_id = (await conn.execute(select(func.min(Comment.id)))).scalar()
+        if user_id is None or parent_id is None or comment_id is None:
+            print("No seeded data found; run with --seed first")
+            return 2
+
+        failures = 0
+        for name, stmt in route_queries(user_id, parent_id, comment_id).items():
+            compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+            # ON CONFLICT SET/WHERE values stay bound even with literal_binds
+            params = tuple(compiled.params[key] for key in compiled.positiontup or ())
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+            raw = result.scalar()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+            scans = seq_scans(plan)
+            if scans:
+                failures += 1
+                print(f"FAIL {name}: sequential scan on {', '.join(sorted(set(scans)))}")
+            else:
+                print(f"ok   {name}")
+
+    await engine.dispose()
+    print(f"\n{failures} regression(s)" if failures else "\nAll plans use indexes")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail on sequential scans in hot route queries")
+    parser.add_argument("--seed", action="store_true", help="Insert synthetic rows before checking")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args.seed)))
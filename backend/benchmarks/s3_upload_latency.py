@@ -0,0 +1,87 @@
+"""
+Benchmark: event-loop latency while large S3 uploads are in flight.
+
+Every request on a uvicorn worker shares one event loop, so the scheduling lag
+measured here is the extra latency any concurrent request would see.
+
+Usage:
+  python benchmarks/s3_upload_latency.py --mode async --uploads 8 --size-mb 10
+  python benchmarks/s3_upload_latency.py --mode sync  --uploads 8 --size-mb 10
+
+Assumes:
+  - An S3-compatible endpoint is reachable through the usual settings, e.g. the
+    MinIO from local-deployment (S3_ENDPOINT_URL=http://localhost:9000) or a
+    moto stand-in (`moto_server -p 5000`, S3_ENDPOINT_URL=http://localhost:5000)
+  - The bucket in S3_BUCKET exists
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Ensure app is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import s3
+from app.config import settings
+
+PROBE_INTERVAL = 0.005  # 5 ms
+
+
+async def probe(stop: asyncio.Event, lags: list[float]):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - t0 - PROBE_INTERVAL)
+
+
+async def upload_sync(key: str, data: bytes):
+    # The pre-async code path: boto3 called directly on the event loop
+    s3._get_client().put_object(
+        Bucket=settings.s3_bucket, Key=key, Body=data, ContentType="audio/mpeg"
+    )
+
+
+async def upload_async(key: str, data: bytes):
+    await s3.upload_audio(key, data, "audio/mpeg")
+
+
+async def run(mode: str, uploads: int, size_mb: int):
+    data = os.urandom(size_mb * 1024 * 1024)
+    upload = upload_async if mode == "async" else upload_sync
+    stop = asyncio.Event()
+    lags: list[float] = []
+
+    probe_task = asyncio.create_task(probe(stop, lags))
+    t0 = time.perf_counter()
+    await asyncio.gather(
+        *(upload(f"bench/upload-latency/{i}.bin", data) for i in range(uploads))
+    )
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await probe_task
+
+    async for keys in s3.list_keys("bench/upload-latency/"):
+        await s3.delete_keys(keys)
+    s3.shutdown()
+
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(f"mode={mode} uploads={uploads} size={size_mb}MB wall={elapsed:.2f}s")
+    print(
+        f"loop lag: samples={len(lags)} p50={statistics.median(lags_ms):.1f}ms "
+        f"p99={p99:.1f}ms max={lags_ms[-1]:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure event-loop lag during S3 uploads")
+    parser.add_argument("--mode", choices=["async", "sync"], default="async")
+    parser.add_argument("--uploads", type=int, default=8, help="Concurrent uploads")
+    parser.add_argument("--size-mb", type=int, default=10, help="Size of each upload in MB")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.mode, args.uploads, args.size_mb))
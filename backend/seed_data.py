@@ -1,32 +1,41 @@
 """
-Seed script: migrates existing cards.json + audio files into the database and S3.
+Seed / bulk loader: loads a cards.json + audio files into the database and S3.
 
 Usage:
-  python seed_data.py --username <admin_username>
+  python seed_data.py --username <username> [--cards PATH] [--audio-dir DIR]
+                      [--checkpoint PATH] [--batch-size N] [--concurrency N] [--restart]
 
 Assumes:
   - Database is migrated (alembic upgrade head)
   - The user already exists (registered via the app)
-  - cards.json is at ../data/cards.json
-  - audio files are at ../audio/
+  - cards.json is at ../data/cards.json and audio files are at ../audio/
+    unless given with --cards / --audio-dir
+
+Rows are written with COPY, a batch of names at a time, and each batch's audio
+is uploaded by a bounded pool of workers. Ids are taken from the sequences
+before anything is written, and every step is recorded in the checkpoint
+file, so an interrupted run picks up where it stopped: finished batches are
+skipped, uploaded audio is not sent again and no row is inserted twice. A
+batch whose audio could not all be uploaded is not written; the run stops
+and running it again retries just the files that failed.
 """
 
+import argparse
 import asyncio
 import json
 import os
 import sys
+import time
 from pathlib import Path
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncpg
 
 # Ensure app is importable
 sys.path.insert(0, os.path.dirname(__file__))
 
 from app.config import settings
-from app.database import async_session, engine
-from app.models import Base, Child, Parent, User
-from app.s3 import build_key, upload_audio
+from app.ranking import keys_between
+from app.s3 import build_key, upload_stream
 
 CARDS_JSON = Path(__file__).parent.parent / "data" / "cards.json"
 AUDIO_DIR = Path(__file__).parent.parent / "audio"
@@ -37,69 +46,285 @@ MIME_MAP = {
     ".wav": "audio/wav",
     ".ogg": "audio/ogg",
 }
+CHILD_COLUMNS = ["id", "parent_id", "name", "phonetic", "meaning", "passage", "audio_key", "sort_order", "rank"]
+MAX_AUDIO_SIZE = 10 * 1024 * 1024
+REPORT_INTERVAL = 5.0
+UPLOAD_ATTEMPTS = 3
+
+
+class Checkpoint:
+    """Loader progress, rewritten atomically after every step.
+
+    ``parents`` maps deck index -> parent id, ``next_item`` is the first name
+    not yet inserted, and ``batch`` holds the ids and uploaded audio keys of
+    the batch in flight.
+    """
+
+    def __init__(self, path: Path, source: str, username: str):
+        self.path = path
+        self.state = {"source": source, "username": username, "parents": {}, "next_item": 0, "batch": None}
+
+    def load(self, restart: bool) -> None:
+        if restart or not self.path.exists():
+            return
+        state = json.loads(self.path.read_text())
+        if (state["source"], state["username"]) != (self.state["source"], self.state["username"]):
+            raise SystemExit(
+                f"{self.path} belongs to a load of {state['source']} for {state['username']}; "
+                "use --restart or another --checkpoint"
+            )
+        self.state = state
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.state))
+        os.replace(tmp, self.path)
+
+
+class UploadsFailed(Exception):
+    def __init__(self, paths: list[Path]):
+        super().__init__(f"{len(paths)} audio uploads failed")
+        self.paths = paths
+
+
+class Progress:
+    def __init__(self, total: int, done: int):
+        self.total = total
+        self.done = done
+        self.start_done = done
+        self.uploads = 0
+        self.upload_bytes = 0
+        self.upload_failures = 0
+        self.started = time.monotonic()
+
+    def report(self) -> None:
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        rate = (self.done - self.start_done) / elapsed
+        mb = self.upload_bytes / (1024 * 1024)
+        eta = f", eta {(self.total - self.done) / rate:.0f}s" if rate and self.done < self.total else ""
+        print(
+            f"[{elapsed:7.1f}s] names {self.done}/{self.total} ({rate:.0f}/s{eta}); "
+            f"audio {self.uploads} files, {mb:.1f} MB ({mb / elapsed:.1f} MB/s), {self.upload_failures} failed"
+        )
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(REPORT_INTERVAL)
+            self.report()
+
+
+class _FileReader:
+    # Async read(n) over a local file, in the shape upload_stream expects
+    def __init__(self, path: Path):
+        self._file = path.open("rb")
+
+    async def read(self, size: int) -> bytes:
+        return await asyncio.to_thread(self._file.read, size)
 
+    def close(self) -> None:
+        self._file.close()
 
-async def seed(username: str):
-    async with async_session() as db:
-        # Find user
-        result = await db.execute(select(User).where(User.username == username))
-        user = result.scalar_one_or_none()
-        if not user:
+
+async def _allocate_ids(conn, table: str, n: int) -> list[int]:
+    rows = await conn.fetch(
+        "SELECT nextval(pg_get_serial_sequence($1, 'id')) AS id FROM generate_series(1, $2)", table, n
+    )
+    return [r["id"] for r in rows]
+
+
+async def _copy_new(conn, table: str, columns: list[str], records: list[tuple]) -> int:
+    """COPY the records whose id (first column) is not in the table yet."""
+    existing = {
+        r["id"] for r in await conn.fetch(f"SELECT id FROM {table} WHERE id = ANY($1::int[])", [r[0] for r in records])
+    }
+    fresh = [r for r in records if r[0] not in existing]
+    if fresh:
+        await conn.copy_records_to_table(table, records=fresh, columns=columns)
+    return len(fresh)
+
+
+async def _upload_batch(
+    jobs: list[tuple[str, Path, str]], concurrency: int, checkpoint: Checkpoint, progress: Progress
+) -> list[Path]:
+    """Upload (key, path, item) jobs with ``concurrency`` workers, recording each
+    finished key in the checkpoint so a re-run does not send it again. Returns
+    the files that still failed after UPLOAD_ATTEMPTS tries."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    uploaded = checkpoint.state["batch"]["audio"]
+    failed: list[Path] = []
+    last_save = time.monotonic()
+
+    async def worker() -> None:
+        nonlocal last_save
+        while not queue.empty():
+            key, path, item = queue.get_nowait()
+            ext = path.suffix.lower()
+            for attempt in range(1, UPLOAD_ATTEMPTS + 1):
+                reader = None
+                try:
+                    reader = _FileReader(path)
+                    size = await upload_stream(key, reader, MIME_MAP.get(ext, "audio/mpeg"), MAX_AUDIO_SIZE)
+                    break
+                except Exception as e:
+                    print(f"  Failed to upload {path.name} (attempt {attempt}/{UPLOAD_ATTEMPTS}): {e}")
+                    progress.upload_failures += 1
+                finally:
+                    if reader is not None:
+                        reader.close()
+                if attempt < UPLOAD_ATTEMPTS:
+                    await asyncio.sleep(2**attempt)
+            else:
+                failed.append(path)
+                continue
+            uploaded[item] = key
+            progress.uploads += 1
+            progress.upload_bytes += size
+            if time.monotonic() - last_save > 1.0:
+                checkpoint.save()
+                last_save = time.monotonic()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    checkpoint.save()
+    return failed
+
+
+async def seed(
+    username: str,
+    cards_path: Path,
+    audio_dir: Path,
+    checkpoint_path: Path,
+    batch_size: int,
+    concurrency: int,
+    restart: bool,
+):
+    with open(cards_path, "r", encoding="utf-8") as f:
+        cards = json.load(f)
+
+    checkpoint = Checkpoint(checkpoint_path, str(cards_path.resolve()), username)
+    checkpoint.load(restart)
+    state = checkpoint.state
+
+    dsn = settings.database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+    conn = await asyncpg.connect(dsn)
+    try:
+        user_id = await conn.fetchval("SELECT id FROM users WHERE username = $1", username)
+        if user_id is None:
             print(f"User '{username}' not found. Register first via the app.")
             return
 
-        # Load cards.json
-        with open(CARDS_JSON, "r", encoding="utf-8") as f:
-            cards = json.load(f)
-
-        for card in cards:
-            # Create parent
-            parent = Parent(user_id=user.id, label=card["name"])
-            db.add(parent)
-            await db.flush()
-            print(f"Created parent: {card['name']} (id={parent.id})")
-
-            children = card.get("children", [])
-            for i, ch in enumerate(children):
-                child = Child(
-                    parent_id=parent.id,
-                    name=ch["name"],
-                    phonetic=ch.get("phonetic"),
-                    meaning=ch.get("meaning", ""),
-                    passage=ch.get("passage"),
-                    sort_order=i,
-                )
-                db.add(child)
-                await db.flush()
-
-                # Upload audio if exists
-                audio_path_str = ch.get("audio", "")
-                if audio_path_str:
-                    audio_file = AUDIO_DIR / Path(audio_path_str).name
-                    if audio_file.exists():
-                        ext = audio_file.suffix.lower()
-                        content_type = MIME_MAP.get(ext, "audio/mpeg")
-                        key = build_key(user.id, parent.id, child.id, ext.lstrip("."))
-                        try:
-                            upload_audio(key, audio_file.read_bytes(), content_type)
-                            child.audio_key = key
-                            print(f"  Uploaded audio: {audio_file.name} -> {key}")
-                        except Exception as e:
-                            print(f"  Failed to upload {audio_file.name}: {e}")
-                    else:
-                        print(f"  Audio file not found: {audio_file}")
-
-                print(f"  Added child: {ch['name']}")
-
-        await db.commit()
-        print("\nSeed complete!")
+        # Decks: ids first (checkpointed), then one COPY of those not written yet
+        missing = [str(d) for d in range(len(cards)) if str(d) not in state["parents"]]
+        if missing:
+            state["parents"].update(zip(missing, await _allocate_ids(conn, "parents", len(missing))))
+            checkpoint.save()
+        async with conn.transaction():
+            created = await _copy_new(
+                conn,
+                "parents",
+                ["id", "user_id", "label"],
+                [(state["parents"][str(d)], user_id, card["name"]) for d, card in enumerate(cards)],
+            )
+        print(f"Decks: {len(cards)} ({created} created)")
 
+        items = [(d, c) for d, card in enumerate(cards) for c in range(len(card.get("children", [])))]
+        ranks: dict[int, list[str]] = {}
+        progress = Progress(len(items), state["next_item"])
+        reporter = asyncio.create_task(progress.run())
+        try:
+            while state["next_item"] < len(items):
+                start = state["next_item"]
+                batch = items[start : start + batch_size]
+                if state["batch"] is None or state["batch"]["start"] != start:
+                    ids = await _allocate_ids(conn, "children", len(batch))
+                    state["batch"] = {"start": start, "ids": ids, "audio": {}}
+                    checkpoint.save()
+                ids = state["batch"]["ids"]
+                uploaded = state["batch"]["audio"]
 
-if __name__ == "__main__":
-    import argparse
+                jobs = []
+                for (d, c), child_id in zip(batch, ids):
+                    item = f"{d}:{c}"
+                    audio = cards[d]["children"][c].get("audio", "")
+                    if not audio or item in uploaded:
+                        continue
+                    path = audio_dir / Path(audio).name
+                    if not path.exists():
+                        print(f"  Audio file not found: {path}")
+                        continue
+                    key = build_key(user_id, state["parents"][str(d)], child_id, path.suffix.lower().lstrip("."))
+                    jobs.append((key, path, item))
+                failed = await _upload_batch(jobs, concurrency, checkpoint, progress)
+                if failed:
+                    # Don't write the batch: its rows would be left without that audio for good
+                    raise UploadsFailed(failed)
+
+                records = []
+                for (d, c), child_id in zip(batch, ids):
+                    children = cards[d]["children"]
+                    if d not in ranks:
+                        ranks[d] = keys_between(None, None, len(children))
+                    ch = children[c]
+                    records.append(
+                        (
+                            child_id,
+                            state["parents"][str(d)],
+                            ch["name"],
+                            ch.get("phonetic"),
+                            ch.get("meaning", ""),
+                            ch.get("passage"),
+                            uploaded.get(f"{d}:{c}"),
+                            c,
+                            ranks[d][c],
+                        )
+                    )
+                async with conn.transaction():
+                    await _copy_new(conn, "children", CHILD_COLUMNS, records)
 
+                state["next_item"] = start + len(batch)
+                state["batch"] = None
+                checkpoint.save()
+                progress.done = state["next_item"]
+        finally:
+            reporter.cancel()
+        progress.report()
+    finally:
+        await conn.close()
+
+    print("\nSeed complete!")
+
+
+if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Seed existing data into DB + S3")
     parser.add_argument("--username", required=True, help="Username of the target user")
+    parser.add_argument("--cards", type=Path, default=CARDS_JSON, help="cards.json to load")
+    parser.add_argument("--audio-dir", type=Path, default=AUDIO_DIR, help="Directory holding the audio files")
+    parser.add_argument(
+        "--checkpoint", type=Path, default=None, help="Progress file (default: <cards>.checkpoint.json)"
+    )
+    parser.add_argument("--batch-size", type=int, default=500, help="Names per COPY batch")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel audio uploads")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
     args = parser.parse_args()
 
-    asyncio.run(seed(args.username))
+    checkpoint = args.checkpoint or args.cards.with_name(args.cards.name + ".checkpoint.json")
+    try:
+        asyncio.run(
+            seed(
+                args.username,
+                args.cards,
+                args.audio_dir,
+                checkpoint,
+                args.batch_size,
+                args.concurrency,
+                args.restart,
+            )
+        )
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; progress is saved in {checkpoint}. Run the same command again to resume.")
+        sys.exit(130)
+    except UploadsFailed as e:
+        print(f"\n{e}: {', '.join(p.name for p in e.paths[:5])}{' ...' if len(e.paths) > 5 else ''}")
+        print(f"Progress is saved in {checkpoint}; run the same command again to retry them.")
+        sys.exit(1)
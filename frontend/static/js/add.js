@@ -6,9 +6,18 @@
   const childrenList = document.getElementById("children-list");
   const parentSelect = document.getElementById("parent-select");
   const parentLabelInput = document.getElementById("parent-label");
+  const pendingSection = document.getElementById("pending-section");
+  const pendingList = document.getElementById("pending-list");
+  const savePendingBtn = document.getElementById("save-pending");
 
   let currentParentId = null;
 
+  const MAX_IMPORT_SIZE = 500 * 1024 * 1024; // MAX_IMPORT_SIZE in child_routes.py
+  const MAX_BULK_CHILDREN = 100; // MAX_BULK_CHILDREN in child_routes.py
+
+  // Names staged in the form, saved together through /children/bulk
+  let pending = [];
+
   async function checkAuth() {
     try {
       const res = await fetch("/api/auth/me", { credentials: "include" });
@@ -54,6 +63,8 @@
     // Update the View Flashcards link
     const viewLink = document.getElementById("view-link");
     if (viewLink) viewLink.href = `/view.html?id=${id}`;
+    const exportLink = document.getElementById("export-link");
+    if (exportLink) exportLink.href = `/api/parents/${id}/children/export`;
     loadChildren();
   }
 
@@ -181,30 +192,123 @@
     });
   }
 
-  // ── Create child ──────────────────────────
-  childForm.addEventListener("submit", async (e) => {
+  // ── Stage children, then create them in batches ──
+  function renderPending() {
+    pendingSection.style.display = pending.length ? "block" : "none";
+    savePendingBtn.textContent = `Save ${pending.length} Name${pending.length === 1 ? "" : "s"}`;
+    pendingList.innerHTML = pending
+      .map(
+        (p, i) => `
+      <li>
+        <div class="child-info">
+          <div class="child-name">${escapeHtml(p.item.name)}</div>
+          <div class="child-meaning">${escapeHtml(p.item.meaning)}</div>
+          ${p.audio ? `<div class="audio-status">&#9835; ${escapeHtml(p.audio.name)}</div>` : ""}
+        </div>
+        <div class="child-actions">
+          <button class="btn-delete-child" data-index="${i}">Remove</button>
+        </div>
+      </li>
+    `
+      )
+      .join("");
+    pendingList.querySelectorAll(".btn-delete-child").forEach((btn) => {
+      btn.addEventListener("click", () => {
+        pending.splice(parseInt(btn.dataset.index), 1);
+        renderPending();
+      });
+    });
+  }
+
+  childForm.addEventListener("submit", (e) => {
     e.preventDefault();
-    const data = Object.fromEntries(new FormData(childForm));
+    const data = new FormData(childForm);
+    const audio = data.get("audio");
+    pending.push({
+      item: {
+        name: data.get("name"),
+        phonetic: data.get("phonetic") || null,
+        meaning: data.get("meaning"),
+        passage: data.get("passage") || null,
+        sort_order: parseInt(data.get("sort_order")) || 0,
+      },
+      audio: audio && audio.size ? audio : null,
+    });
+    childForm.reset();
+    renderPending();
+  });
 
-    const res = await fetch(`/api/parents/${currentParentId}/children/`, {
+  async function saveBatch(batch) {
+    const formData = new FormData();
+    const items = batch.map((p) => ({ ...p.item, audio_index: null }));
+    batch.forEach((p, i) => {
+      if (!p.audio) return;
+      items[i].audio_index = formData.getAll("audio").length;
+      formData.append("audio", p.audio);
+    });
+    formData.append("items", JSON.stringify(items));
+    const res = await fetch(`/api/parents/${currentParentId}/children/bulk`, {
       method: "POST",
-      headers: { "Content-Type": "application/json" },
       credentials: "include",
-      body: JSON.stringify({
-        name: data.name,
-        phonetic: data.phonetic || null,
-        meaning: data.meaning,
-        passage: data.passage || null,
-        sort_order: parseInt(data.sort_order) || 0,
-      }),
+      body: formData,
+    });
+    if (!res.ok) {
+      const err = await res.json().catch(() => ({}));
+      throw new Error(typeof err.detail === "string" ? err.detail : "Failed to add names");
+    }
+    return await res.json();
+  }
+
+  savePendingBtn.addEventListener("click", async () => {
+    if (!currentParentId || !pending.length) return;
+    savePendingBtn.disabled = true;
+    const audioErrors = [];
+    try {
+      while (pending.length) {
+        const batch = pending.slice(0, MAX_BULK_CHILDREN);
+        const results = await saveBatch(batch);
+        results.filter((r) => r.audio_error).forEach((r) => audioErrors.push(`${batch[r.index].item.name}: ${r.audio_error}`));
+        pending = pending.slice(batch.length);
+      }
+    } catch (err) {
+      alert(err.message);
+    } finally {
+      savePendingBtn.disabled = false;
+      renderPending();
+      loadChildren();
+    }
+    if (audioErrors.length) alert(`Saved without audio:\n${audioErrors.join("\n")}`);
+  });
+
+  // ── Import names (export ZIP, manifest.json or cards.csv) ──
+  document.getElementById("import-file")?.addEventListener("change", async (e) => {
+    const file = e.target.files[0];
+    e.target.value = "";
+    if (!file || !currentParentId) return;
+    if (file.size > MAX_IMPORT_SIZE) {
+      alert("Import file too large (max 500MB)");
+      return;
+    }
+
+    const formData = new FormData();
+    formData.append("file", file);
+    const res = await fetch(`/api/parents/${currentParentId}/children/import`, {
+      method: "POST",
+      credentials: "include",
+      body: formData,
     });
 
     if (!res.ok) {
-      alert("Failed to add name");
+      const err = await res.json().catch(() => ({}));
+      alert(typeof err.detail === "string" ? err.detail : "Failed to import names");
       return;
     }
 
-    childForm.reset();
+    const results = await res.json();
+    const failed = results.filter((r) => r.audio_error);
+    if (failed.length) {
+      alert(`Imported ${results.length} names; ${failed.length} without audio (${failed[0].audio_error}).`);
+    }
     loadChildren();
   });
 
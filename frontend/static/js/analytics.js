@@ -163,20 +163,31 @@
   });
 
   // ── Feed (comments + reactions) ──────────────
+  const FEED_PAGE_SIZE = 50;
+  let feedComments = [];
+  let feedLatestCursor = null;
+  let feedNextCursor = null;
+
   async function loadFeed() {
-    const res = await fetch("/api/analytics/comments", { credentials: "include" });
+    const res = await fetch(`/api/analytics/comments?limit=${FEED_PAGE_SIZE}`, { credentials: "include" });
     if (!res.ok) return;
+    feedLatestCursor = res.headers.get("X-Latest-Cursor");
+    feedNextCursor = res.headers.get("X-Next-Cursor");
     const data = await res.json();
+    feedComments = data.comments;
+    renderReactions(data.reactions);
+    renderComments();
+  }
 
+  function renderReactions(reactions) {
     const reactionsArea = document.getElementById("reactions-area");
-    const feed = document.getElementById("feed");
 
     // ── Reactions (static, above comments) ──
-    if (!data.reactions.length) {
+    if (!reactions.length) {
       reactionsArea.innerHTML = '<p class="empty-feed">No reactions yet.</p>';
     } else {
       const reactionsByParent = {};
-      data.reactions.forEach((r) => {
+      reactions.forEach((r) => {
         if (!reactionsByParent[r.parent_id]) {
           reactionsByParent[r.parent_id] = { reactions: [], parentLabel: "" };
         }
@@ -192,7 +203,7 @@
       for (const [pid, group] of Object.entries(reactionsByParent)) {
         const counts = {};
         group.reactions.forEach((r) => {
-          counts[r.emoji] = (counts[r.emoji] || 0) + 1;
+          counts[r.emoji] = (counts[r.emoji] || 0) + r.count;
         });
 
         rHtml += `
@@ -207,13 +218,17 @@
       }
       reactionsArea.innerHTML = rHtml;
     }
+  }
+
+  function renderComments() {
+    const feed = document.getElementById("feed");
 
     // ── Comments (scrollable) ──
-    if (!data.comments.length) {
+    if (!feedComments.length) {
       feed.innerHTML = '<p class="empty-feed">No comments yet.</p>';
     } else {
       let cHtml = "";
-      data.comments.forEach((c) => {
+      feedComments.forEach((c) => {
         const avatarHtml = c.profile_picture_url
           ? `<img class="feed-avatar" src="${escapeHtml(c.profile_picture_url)}" alt="" />`
           : `<div class="feed-avatar feed-avatar-default"></div>`;
@@ -231,6 +246,52 @@
       });
       feed.innerHTML = cHtml;
     }
+
+    if (feedNextCursor) {
+      const btn = document.createElement("button");
+      btn.className = "show-more-btn";
+      btn.textContent = "Load older comments";
+      btn.addEventListener("click", loadOlderFeed);
+      feed.appendChild(btn);
+    }
+  }
+
+  async function loadOlderFeed(e) {
+    e.currentTarget.disabled = true;
+    try {
+      const cursor = encodeURIComponent(feedNextCursor);
+      const res = await fetch(`/api/analytics/comments?limit=${FEED_PAGE_SIZE}&cursor=${cursor}`, { credentials: "include" });
+      if (!res.ok) throw new Error("Failed to load older comments");
+      feedNextCursor = res.headers.get("X-Next-Cursor");
+      feedComments = feedComments.concat((await res.json()).comments);
+    } catch { /* keep what is shown; the button comes back */ }
+    const feed = document.getElementById("feed");
+    const scrollTop = feed.scrollTop;
+    renderComments();
+    feed.scrollTop = scrollTop;
+  }
+
+  // Per-deck emoji totals; the ETag makes an unchanged answer a 304 revalidation
+  async function refreshReactions() {
+    const res = await fetch("/api/analytics/reactions", { credentials: "include" });
+    if (res.ok) renderReactions(await res.json());
+  }
+
+  // Prepend comments newer than the newest shown; 304 means nothing is new
+  async function loadNewerFeed() {
+    let added = false;
+    while (feedLatestCursor) {
+      const since = encodeURIComponent(feedLatestCursor);
+      const res = await fetch(`/api/analytics/comments?since=${since}&limit=${FEED_PAGE_SIZE}`, { credentials: "include" });
+      if (res.status === 304 || !res.ok) break;
+      // Each page is the oldest of what is new, so later pages go on top
+      const newer = (await res.json()).comments;
+      feedLatestCursor = res.headers.get("X-Latest-Cursor") || feedLatestCursor;
+      feedComments = newer.concat(feedComments);
+      added = true;
+      if (newer.length < FEED_PAGE_SIZE) break;
+    }
+    return added;
   }
 
   // ── Logout ───────────────────────────────────
@@ -244,74 +305,18 @@
     try {
       await loadSummary();
 
-      const res = await fetch("/api/analytics/comments", { credentials: "include" });
-      if (!res.ok) return;
-      const data = await res.json();
-
-      const feed = document.getElementById("feed");
-      const scrollTop = feed ? feed.scrollTop : 0;
-
-      if (!data.comments.length) {
-        feed.innerHTML = '<p class="empty-feed">No comments yet.</p>';
-      } else {
-        let cHtml = "";
-        data.comments.forEach((c) => {
-          const avatarHtml = c.profile_picture_url
-            ? `<img class="feed-avatar" src="${escapeHtml(c.profile_picture_url)}" alt="" />`
-            : `<div class="feed-avatar feed-avatar-default"></div>`;
-          cHtml += `
-            <div class="feed-item">
-              ${avatarHtml}
-              <div class="feed-item-body">
-                <div class="feed-header">
-                  <span class="feed-author">${escapeHtml(c.full_name)} <span class="feed-parent">on ${escapeHtml(c.parent_label)}</span></span>
-                  <span class="feed-time">${formatDateTime(c.created_at)}</span>
-                </div>
-                <div class="feed-text">${escapeHtml(c.text)}</div>
-              </div>
-            </div>`;
-        });
-        feed.innerHTML = cHtml;
+      // An empty feed has no cursor to poll from yet; the full load brings reactions too
+      if (!feedLatestCursor) {
+        await loadFeed();
+        return;
       }
+      await refreshReactions();
+      if (!(await loadNewerFeed())) return;
 
-      if (feed) feed.scrollTop = scrollTop;
-
-      // Also refresh reactions area
-      const reactionsArea = document.getElementById("reactions-area");
-      if (!data.reactions.length) {
-        reactionsArea.innerHTML = '<p class="empty-feed">No reactions yet.</p>';
-      } else {
-        const reactionsByParent = {};
-        data.reactions.forEach((r) => {
-          if (!reactionsByParent[r.parent_id]) {
-            reactionsByParent[r.parent_id] = { reactions: [], parentLabel: "" };
-          }
-          reactionsByParent[r.parent_id].reactions.push(r);
-        });
-
-        for (const pid of Object.keys(reactionsByParent)) {
-          const parent = ownedParents.find((p) => p.id == pid);
-          reactionsByParent[pid].parentLabel = parent ? parent.label : `Baby #${pid}`;
-        }
-
-        let rHtml = "";
-        for (const [pid, group] of Object.entries(reactionsByParent)) {
-          const counts = {};
-          group.reactions.forEach((r) => {
-            counts[r.emoji] = (counts[r.emoji] || 0) + 1;
-          });
-          rHtml += `
-            <div class="reaction-group">
-              <div class="rg-header">Reactions on <strong>${escapeHtml(group.parentLabel)}</strong></div>
-              <div class="reaction-pills">
-                ${Object.entries(counts)
-                  .map(([emoji, count]) => `<span class="reaction-pill"><span class="emoji">${emoji}</span><span class="count">${count}</span></span>`)
-                  .join("")}
-              </div>
-            </div>`;
-        }
-        reactionsArea.innerHTML = rHtml;
-      }
+      const feed = document.getElementById("feed");
+      const scrollTop = feed.scrollTop;
+      renderComments();
+      feed.scrollTop = scrollTop;
     } catch { /* silent fail */ }
   }
 
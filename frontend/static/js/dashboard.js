@@ -8,8 +8,11 @@
   const pageInfo = document.getElementById("page-info");
   const pageSizeBtns = document.querySelectorAll(".page-size-btn");
 
-  let allParents = [];
+  let pageParents = [];
   let currentPage = 1;
+  // pageCursors[i] is the cursor that loads page i + 1; page 1 has none
+  let pageCursors = [null];
+  let nextCursor = null;
   let pageSize = parseInt(localStorage.getItem("dashboard-page-size") || "12");
 
   // Highlight the active page size button
@@ -31,9 +34,17 @@
     }
   }
 
-  async function loadParents() {
-    const res = await fetch("/api/parents/", { credentials: "include" });
-    if (!res.ok) return [];
+  async function loadPage() {
+    const params = new URLSearchParams({ limit: String(pageSize) });
+    const cursor = pageCursors[currentPage - 1];
+    if (cursor) params.set("cursor", cursor);
+    const res = await fetch(`/api/parents/?${params}`, { credentials: "include" });
+    if (!res.ok) {
+      nextCursor = null;
+      return [];
+    }
+    nextCursor = res.headers.get("X-Next-Cursor");
+    pageCursors[currentPage] = nextCursor;
     return await res.json();
   }
 
@@ -45,17 +56,8 @@
     });
   }
 
-  function getTotalPages() {
-    return Math.max(1, Math.ceil(allParents.length / pageSize));
-  }
-
-  function getPagedParents() {
-    const start = (currentPage - 1) * pageSize;
-    return allParents.slice(start, start + pageSize);
-  }
-
   function renderPagination() {
-    if (!allParents.length) {
+    if (!pageParents.length) {
       pagination.style.display = "none";
       return;
     }
@@ -63,8 +65,7 @@
     // Always show pagination bar when there are items (for the page size selector)
     pagination.style.display = "flex";
 
-    const totalPages = getTotalPages();
-    const hasMultiplePages = totalPages > 1;
+    const hasMultiplePages = currentPage > 1 || !!nextCursor;
 
     // Show/hide prev/next and page info based on whether there are multiple pages
     const paginationControls = pagination.querySelector(".pagination-controls");
@@ -73,14 +74,14 @@
     }
 
     if (hasMultiplePages) {
-      pageInfo.textContent = `Page ${currentPage} of ${totalPages}`;
+      pageInfo.textContent = `Page ${currentPage}`;
       prevPageBtn.disabled = currentPage <= 1;
-      nextPageBtn.disabled = currentPage >= totalPages;
+      nextPageBtn.disabled = !nextCursor;
     }
   }
 
   function renderGrid(parents) {
-    if (!allParents.length) {
+    if (!parents.length) {
       grid.style.display = "none";
       emptyState.style.display = "block";
       pagination.style.display = "none";
@@ -117,7 +118,7 @@
       btn.addEventListener("click", (e) => {
         e.stopPropagation();
         const id = btn.dataset.id;
-        const parent = allParents.find((p) => p.id == id);
+        const parent = pageParents.find((p) => p.id == id);
         const newLabel = prompt("Rename baby:", parent?.label);
         if (newLabel && newLabel.trim()) {
           updateParent(id, newLabel.trim());
@@ -136,9 +137,16 @@
     renderPagination();
   }
 
-  function renderCurrentPage() {
-    const paged = getPagedParents();
-    renderGrid(paged);
+  async function renderCurrentPage() {
+    pageParents = await loadPage();
+
+    // Step back if the page emptied out (e.g. after deleting its last baby)
+    while (!pageParents.length && currentPage > 1) {
+      currentPage--;
+      pageParents = await loadPage();
+    }
+
+    renderGrid(pageParents);
   }
 
   // Pagination events
@@ -153,7 +161,7 @@
 
   if (nextPageBtn) {
     nextPageBtn.addEventListener("click", () => {
-      if (currentPage < getTotalPages()) {
+      if (nextCursor) {
         currentPage++;
         renderCurrentPage();
       }
@@ -165,6 +173,7 @@
       pageSize = parseInt(btn.dataset.size);
       localStorage.setItem("dashboard-page-size", String(pageSize));
       currentPage = 1;
+      pageCursors = [null];
       updatePageSizeBtns();
       renderCurrentPage();
     });
@@ -227,13 +236,7 @@
     const welcome = document.getElementById("welcome-name");
     if (welcome) welcome.textContent = user.full_name.split(" ")[0];
 
-    allParents = await loadParents();
-
-    // Clamp current page if data changed (e.g. after delete)
-    const totalPages = getTotalPages();
-    if (currentPage > totalPages) currentPage = totalPages;
-
-    renderCurrentPage();
+    await renderCurrentPage();
   }
 
   init();
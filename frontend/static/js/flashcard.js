@@ -68,6 +68,47 @@ const PRESET_EMOJIS = [
   "\uD83D\uDC23", "\uD83C\uDF80", "\uD83D\uDE0E", "\uD83E\uDD73", "\uD83D\uDC95", "\uD83C\uDF1E",
 ];
 
+const DETAILS_BATCH_SIZE = 100;
+
+function toParent(d, audioLoaded) {
+  return {
+    id: d.id,
+    name: d.label,
+    is_owner: d.is_owner,
+    is_shared: d.is_shared,
+    owner_name: d.owner_name,
+    audioLoaded,
+    children: (d.children || []).map((c) => ({
+      id: c.id,
+      name: c.name,
+      phonetic: c.phonetic || "",
+      meaning: c.meaning,
+      passage: c.passage || "",
+      audio: c.audio_url || "",
+    })),
+  };
+}
+
+async function ensureAudio(parent) {
+  if (!parent || parent.audioLoaded) return;
+  parent.audioLoaded = true;
+  try {
+    const query = new URLSearchParams({ ids: parent.id, include_audio: "true" });
+    const res = await fetch(`/api/parents/details?${query}`, { credentials: "include" });
+    if (!res.ok) throw new Error("Failed to load audio");
+    const [data] = await res.json();
+    if (!data) throw new Error("Failed to load audio");
+    const urls = new Map((data.children || []).map((c) => [c.id, c.audio_url || ""]));
+    parent.children.forEach((c) => {
+      if (urls.has(c.id)) c.audio = urls.get(c.id);
+    });
+    if (getCurrentParent() === parent) renderCard();
+  } catch (err) {
+    console.error(err);
+    parent.audioLoaded = false;
+  }
+}
+
 /* =========================
    LOAD DATA
    ========================= */
@@ -124,53 +165,30 @@ async function loadCards() {
       const listRes = await fetch("/api/parents/", { credentials: "include" });
       if (listRes.ok) {
         const allParents = await listRes.json();
-        const detailed = await Promise.all(
-          allParents.map(async (p) => {
-            if (p.id == parentId) return data;
-            const r = await fetch(`/api/parents/${p.id}`, { credentials: "include" });
-            if (!r.ok) return null;
-            return await r.json();
+        // One batched request for the other decks; their audio is signed lazily on switch
+        const otherIds = allParents.map((p) => p.id).filter((id) => id != parentId);
+        const detailed = [];
+        for (let i = 0; i < otherIds.length; i += DETAILS_BATCH_SIZE) {
+          const query = otherIds
+            .slice(i, i + DETAILS_BATCH_SIZE)
+            .map((id) => `ids=${id}`)
+            .join("&");
+          const r = await fetch(`/api/parents/details?${query}`, { credentials: "include" });
+          if (r.ok) detailed.push(...(await r.json()));
+        }
+        const byId = new Map(detailed.map((d) => [d.id, d]));
+        parents = allParents
+          .map((p) => {
+            if (p.id == parentId) return toParent(data, true);
+            return byId.has(p.id) ? toParent(byId.get(p.id), false) : null;
           })
-        );
-        parents = detailed
-          .filter(Boolean)
-          .map((d) => ({
-            id: d.id,
-            name: d.label,
-            is_owner: d.is_owner,
-            is_shared: d.is_shared,
-            owner_name: d.owner_name,
-            children: (d.children || []).map((c) => ({
-              id: c.id,
-              name: c.name,
-              phonetic: c.phonetic || "",
-              meaning: c.meaning,
-              passage: c.passage || "",
-              audio: c.audio_url || "",
-            })),
-          }));
+          .filter(Boolean);
 
         parentIndex = parents.findIndex((p) => p.id == parentId);
         if (parentIndex === -1) parentIndex = 0;
       }
     } else {
-      parents = [
-        {
-          id: data.id,
-          name: data.label,
-          is_owner: data.is_owner,
-          is_shared: data.is_shared,
-          owner_name: data.owner_name,
-          children: (data.children || []).map((c) => ({
-            id: c.id,
-            name: c.name,
-            phonetic: c.phonetic || "",
-            meaning: c.meaning,
-            passage: c.passage || "",
-            audio: c.audio_url || "",
-          })),
-        },
-      ];
+      parents = [toParent(data, true)];
       parentIndex = 0;
     }
 
@@ -322,6 +340,7 @@ function renderParent() {
   childIndex = 0;
   measureCardWidth();
   renderCard();
+  ensureAudio(getCurrentParent());
 }
 
 function renderCard() {
@@ -637,6 +656,7 @@ function formatDate(iso) {
 }
 
 let commentRefreshInterval = null;
+let deckEvents = null;
 
 async function loadEngagement(parentId) {
   hideReactionUserTooltip();
@@ -650,42 +670,132 @@ async function loadEngagement(parentId) {
     : `/api/parents/${parentId}`;
 
   const [reactionsRes, commentsRes] = await Promise.all([
-    fetch(`${apiBase}/reactions`, { credentials: "include" }),
-    fetch(`${apiBase}/comments`, { credentials: "include" }),
+    fetch(`${apiBase}/reactions/summary`, { credentials: "include" }),
+    fetch(`${apiBase}/comments?limit=${COMMENTS_PER_PAGE}`, { credentials: "include" }),
   ]);
 
-  const reactions = reactionsRes.ok ? await reactionsRes.json() : [];
+  const summary = reactionsRes.ok ? await reactionsRes.json() : { total: 0, reactions: [] };
   const comments = commentsRes.ok ? await commentsRes.json() : [];
+  commentsNextCursor = commentsRes.ok ? commentsRes.headers.get("X-Next-Cursor") : null;
+  commentsLatestCursor = commentsRes.ok ? commentsRes.headers.get("X-Latest-Cursor") : null;
 
-  renderReactions(parentId, reactions);
+  renderReactions(parentId, summary);
   renderComments(parentId, comments);
   attachCommentForm(parentId);
-  attachReactionToggle(reactions.length > 0);
+  attachReactionToggle(summary.total > 0);
+
+  // Live updates over server-sent events, polling only as a fallback
+  connectDeckEvents(parentId);
+}
 
-  // Auto-refresh comments every 30 seconds
+function startCommentPolling(parentId) {
   if (commentRefreshInterval) clearInterval(commentRefreshInterval);
   commentRefreshInterval = setInterval(() => refreshComments(parentId), 30000);
 }
 
-async function refreshComments(parentId) {
+function connectDeckEvents(parentId) {
+  if (deckEvents) deckEvents.close();
+  deckEvents = null;
+  if (commentRefreshInterval) clearInterval(commentRefreshInterval);
+  commentRefreshInterval = null;
+
+  if (typeof EventSource === "undefined") {
+    startCommentPolling(parentId);
+    return;
+  }
+
+  const source = new EventSource(`/api/parents/${parentId}/events`, { withCredentials: true });
+  deckEvents = source;
+  let opened = false;
+
+  source.onopen = () => {
+    // Events sent while reconnecting are lost; catch up once the stream is back
+    if (opened) {
+      refreshComments(parentId);
+      refreshReactions(parentId);
+    }
+    opened = true;
+  };
+  source.addEventListener("comment", () => refreshComments(parentId));
+  source.addEventListener("reaction", () => refreshReactions(parentId));
+  source.addEventListener("comment_reaction", (e) => {
+    const { comment_id: commentId } = JSON.parse(e.data);
+    if (commentReactionsCache[commentId]) loadCommentReactions([commentId]);
+  });
+  source.addEventListener("children", () => reloadDeck(parentId));
+  source.addEventListener("deck", () => reloadDeck(parentId));
+  source.addEventListener("resync", () => {
+    reloadDeck(parentId);
+    loadEngagement(parentId);
+  });
+  source.onerror = () => {
+    // The browser retries by itself; fall back to polling once it gives up
+    if (source.readyState === EventSource.CLOSED && deckEvents === source) {
+      deckEvents = null;
+      startCommentPolling(parentId);
+    }
+  };
+}
+
+async function reloadDeck(parentId) {
+  const index = parents.findIndex((p) => p.id == parentId);
+  if (index === -1) return;
+  const endpoint = isGuest ? `/api/parents/${parentId}/public` : `/api/parents/${parentId}`;
   try {
-    const endpoint = isGuest
-      ? `/api/parents/${parentId}/public/comments`
-      : `/api/parents/${parentId}/comments`;
     const res = await fetch(endpoint, { credentials: "include" });
     if (!res.ok) return;
-    const comments = await res.json();
-
-    // Only re-render if comment count changed
-    if (comments.length !== allComments.length) {
-      const list = document.getElementById("comments-list");
-      const scrollTop = list ? list.scrollTop : 0;
-      renderComments(parentId, comments);
-      if (list) list.scrollTop = scrollTop;
+    parents[index] = toParent(await res.json(), true);
+    if (index === parentIndex) {
+      childIndex = Math.min(childIndex, Math.max(parents[index].children.length - 1, 0));
+      renderCard();
+      updatePageMeta();
     }
   } catch { /* silent fail on network issues */ }
 }
 
+function commentsEndpoint(parentId) {
+  return isGuest
+    ? `/api/parents/${parentId}/public/comments`
+    : `/api/parents/${parentId}/comments`;
+}
+
+async function refreshComments(parentId) {
+  try {
+    // Ask only for comments newer than the newest one we have; 304 means nothing new
+    const query = commentsLatestCursor
+      ? `since=${encodeURIComponent(commentsLatestCursor)}`
+      : `limit=${COMMENTS_PER_PAGE}`;
+    const res = await fetch(`${commentsEndpoint(parentId)}?${query}`, { credentials: "include" });
+    if (res.status === 304 || !res.ok) return;
+    const newComments = await res.json();
+    if (newComments.length === 0) return;
+
+    if (!commentsLatestCursor) commentsNextCursor = res.headers.get("X-Next-Cursor");
+    commentsLatestCursor = res.headers.get("X-Latest-Cursor") || commentsLatestCursor;
+
+    const list = document.getElementById("comments-list");
+    const scrollTop = list ? list.scrollTop : 0;
+    renderComments(parentId, newComments.concat(allComments));
+    if (list) list.scrollTop = scrollTop;
+  } catch { /* silent fail on network issues */ }
+}
+
+async function loadOlderComments() {
+  const parentId = commentsParentId;
+  if (commentsShown >= allComments.length && commentsNextCursor) {
+    try {
+      const query = `limit=${COMMENTS_PER_PAGE}&cursor=${encodeURIComponent(commentsNextCursor)}`;
+      const res = await fetch(`${commentsEndpoint(parentId)}?${query}`, { credentials: "include" });
+      if (!res.ok || parentId !== commentsParentId) return;
+      allComments = allComments.concat(await res.json());
+      commentsNextCursor = res.headers.get("X-Next-Cursor");
+    } catch {
+      return;
+    }
+  }
+  showMoreComments();
+}
+
 function attachReactionToggle(hasExisting) {
   const toggleBtn = document.getElementById("reaction-toggle");
   const wrap = document.getElementById("reaction-scroll-wrap");
@@ -726,7 +836,15 @@ function attachReactionToggle(hasExisting) {
   }
 }
 
-function renderReactions(parentId, reactions) {
+async function refreshReactions(parentId) {
+  const endpoint = isGuest
+    ? `/api/parents/${parentId}/public/reactions/summary`
+    : `/api/parents/${parentId}/reactions/summary`;
+  const res = await fetch(endpoint, { credentials: "include" });
+  if (res.ok) renderReactions(parentId, await res.json());
+}
+
+function renderReactions(parentId, summary) {
   const bar = document.getElementById("reaction-bar");
   if (!bar) return;
 
@@ -735,9 +853,9 @@ function renderReactions(parentId, reactions) {
   const userCounts = {};
   PRESET_EMOJIS.forEach((e) => { totalCounts[e] = 0; userCounts[e] = 0; });
 
-  reactions.forEach((r) => {
-    totalCounts[r.emoji] = (totalCounts[r.emoji] || 0) + 1;
-    if (r.user_id === currentUserId) userCounts[r.emoji] = (userCounts[r.emoji] || 0) + 1;
+  summary.reactions.forEach((r) => {
+    totalCounts[r.emoji] = r.count;
+    userCounts[r.emoji] = r.my_count;
   });
 
   bar.innerHTML = PRESET_EMOJIS.map((emoji) => `
@@ -773,8 +891,7 @@ function renderReactions(parentId, reactions) {
         credentials: "include",
         body: JSON.stringify({ emoji }),
       });
-      const res = await fetch(`/api/parents/${parentId}/reactions`, { credentials: "include" });
-      if (res.ok) renderReactions(parentId, await res.json());
+      await refreshReactions(parentId);
     });
 
     // Right click: remove one
@@ -792,8 +909,7 @@ function renderReactions(parentId, reactions) {
         credentials: "include",
         body: JSON.stringify({ emoji }),
       });
-      const res = await fetch(`/api/parents/${parentId}/reactions`, { credentials: "include" });
-      if (res.ok) renderReactions(parentId, await res.json());
+      await refreshReactions(parentId);
     });
   });
 }
@@ -803,7 +919,10 @@ const COMMENT_REACTION_EMOJIS = ["\u2764\uFE0F", "\uD83D\uDC4D", "\uD83D\uDD25",
 let allComments = [];
 let commentsShown = 0;
 let commentsParentId = null;
-// Cache: { [commentId]: [ {id, user_id, username, comment_id, emoji}, ... ] }
+// Keyset cursors: older page to fetch next, and newest comment seen (for delta polling)
+let commentsNextCursor = null;
+let commentsLatestCursor = null;
+// Cache: { [commentId]: [ {emoji, count, reacted, usernames}, ... ] }
 let commentReactionsCache = {};
 
 // Reaction user tooltip state
@@ -864,33 +983,36 @@ function showMoreComments() {
       authorEl.addEventListener("click", () => showUserProfileModal(authorEl.dataset.username));
     }
     list.appendChild(item);
-    loadCommentReactions(c.id);
   });
+  loadCommentReactions(nextBatch.map((c) => c.id));
 
   commentsShown += nextBatch.length;
 
-  // Add "Show more" button if there are remaining comments
-  if (commentsShown < allComments.length) {
-    const remaining = allComments.length - commentsShown;
+  // Add "Show more" button if there are remaining comments, loaded or not
+  if (commentsShown < allComments.length || commentsNextCursor) {
     const btn = document.createElement("button");
     btn.className = "show-more-btn";
-    btn.textContent = `Show more (${remaining})`;
-    btn.addEventListener("click", showMoreComments);
+    btn.textContent = "Show more";
+    btn.addEventListener("click", loadOlderComments);
     list.appendChild(btn);
   }
 }
 
-async function loadCommentReactions(commentId) {
+async function loadCommentReactions(commentIds) {
+  if (commentIds.length === 0) return;
   const parentId = commentsParentId;
   const apiBase = isGuest
-    ? `/api/parents/${parentId}/public/comments/${commentId}/reactions`
-    : `/api/parents/${parentId}/comments/${commentId}/reactions`;
+    ? `/api/parents/${parentId}/public/comments/reactions`
+    : `/api/parents/${parentId}/comments/reactions`;
+  const query = commentIds.map((id) => `ids=${id}`).join("&");
   try {
-    const res = await fetch(apiBase, { credentials: "include" });
+    const res = await fetch(`${apiBase}?${query}`, { credentials: "include" });
     if (!res.ok) return;
-    const reactions = await res.json();
-    commentReactionsCache[commentId] = reactions;
-    renderCommentReactions(commentId);
+    const summaries = await res.json();
+    summaries.forEach((s) => {
+      commentReactionsCache[s.comment_id] = s.reactions;
+      renderCommentReactions(s.comment_id);
+    });
   } catch { /* silent */ }
 }
 
@@ -901,16 +1023,15 @@ function renderCommentReactions(commentId) {
   const reactions = commentReactionsCache[commentId] || [];
   const parentId = commentsParentId;
 
-  // Build counts, user flags, and per-emoji user lists
+  // Counts, user flags and a sample of reactor names, aggregated server-side
   const counts = {};
   const userReacted = {};
   const usersPerEmoji = {};
   COMMENT_REACTION_EMOJIS.forEach((e) => { counts[e] = 0; userReacted[e] = false; usersPerEmoji[e] = []; });
   reactions.forEach((r) => {
-    counts[r.emoji] = (counts[r.emoji] || 0) + 1;
-    if (r.user_id === currentUserId) userReacted[r.emoji] = true;
-    if (!usersPerEmoji[r.emoji]) usersPerEmoji[r.emoji] = [];
-    usersPerEmoji[r.emoji].push(r.username);
+    counts[r.emoji] = r.count;
+    userReacted[r.emoji] = r.reacted;
+    usersPerEmoji[r.emoji] = r.usernames;
   });
 
   // Only show emojis that have at least one reaction
@@ -939,10 +1060,9 @@ function renderCommentReactions(commentId) {
   container.querySelectorAll(".comment-reaction-btn").forEach((btn) => {
     const emoji = btn.dataset.emoji;
     const users = usersPerEmoji[emoji] || [];
-    const MAX_NAMES = 5;
-    const tooltipText = users.length <= MAX_NAMES
+    const tooltipText = counts[emoji] <= users.length
       ? users.join(", ")
-      : users.slice(0, MAX_NAMES).join(", ") + ` +${users.length - MAX_NAMES} more`;
+      : users.join(", ") + ` +${counts[emoji] - users.length} more`;
     const tooltipKey = `${commentId}:${emoji}`;
 
     // Desktop: hover shows who reacted
@@ -975,7 +1095,7 @@ function renderCommentReactions(commentId) {
           credentials: "include",
           body: JSON.stringify({ emoji }),
         });
-        if (res.ok) await loadCommentReactions(commentId);
+        if (res.ok) await loadCommentReactions([commentId]);
       } finally {
         btn.disabled = false;
       }
@@ -1008,7 +1128,7 @@ function renderCommentReactions(commentId) {
           credentials: "include",
           body: JSON.stringify({ emoji: btn.dataset.emoji }),
         });
-        if (res.ok) await loadCommentReactions(commentId);
+        if (res.ok) await loadCommentReactions([commentId]);
       } finally {
         btn.disabled = false;
       }
@@ -1104,8 +1224,7 @@ function attachCommentForm(parentId) {
     if (res.ok) {
       textarea.value = "";
       showStatus("Comment posted!", "success");
-      const commentsRes = await fetch(`/api/parents/${parentId}/comments`, { credentials: "include" });
-      if (commentsRes.ok) renderComments(parentId, await commentsRes.json());
+      await refreshComments(parentId);
     } else {
       showStatus("Failed to post comment.", "error");
     }